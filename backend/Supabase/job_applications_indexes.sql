@@ -0,0 +1,17 @@
+-- Indexes backing the recruiter read paths on job_applications
+
+-- Keyset pagination needs a total order, so unscored applications rank as 0
+UPDATE public.job_applications SET match_percentage = 0 WHERE match_percentage IS NULL;
+ALTER TABLE public.job_applications ALTER COLUMN match_percentage SET NOT NULL;
+
+-- Ranked applicants for a job: WHERE job_id = ? ORDER BY match_percentage DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_job_applications_job_match
+    ON public.job_applications (job_id, match_percentage DESC, id DESC);
+
+-- Applicants for a job within an applied_at window
+CREATE INDEX IF NOT EXISTS idx_job_applications_job_applied
+    ON public.job_applications (job_id, applied_at DESC);
+
+-- A candidate's own applications
+CREATE INDEX IF NOT EXISTS idx_job_applications_candidate
+    ON public.job_applications (candidate_id);
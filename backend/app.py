@@ -1,25 +1,47 @@
-from flask import Flask, send_file, jsonify, request
+from flask import Flask, Response, send_file, jsonify, request, stream_with_context
 from flask_cors import CORS
 import os
-import tempfile
+import math
 import requests
-from db import get_job_application_resume, download_resume_from_storage, get_job_description, update_match_percentage
-from resume_matcher import ResumeMatcher
-import json
-import uuid
+from db import (
+    get_job_application_resume, download_resume_bytes, open_resume_stream, get_job_description, update_match_percentage,
+    get_job_application, get_ranked_applications, get_candidate_resume_profile
+)
+from resume_matcher import ResumeMatcher, router
+from skill_taxonomy import vector_to_skills
+from blob_cache import BlobCache
+from blob_store import create_blob_store, is_blob_key
+from work_queue import create_match_queue, create_result_store
+from matching_worker import create_worker
 
 app = Flask(__name__)
 CORS(app)
 
-# Create temp directories if they don't exist
-TEMP_DIR = os.path.join(os.path.dirname(__file__), 'temp_resumes')
-TEMP_JD_DIR = os.path.join(os.path.dirname(__file__), 'temp_jd')
-os.makedirs(TEMP_DIR, exist_ok=True)
-os.makedirs(TEMP_JD_DIR, exist_ok=True)
-
-# Initialize ResumeMatcher
+# Initialize ResumeMatcher; it owns the temp_resumes and temp_jd spools
 resume_matcher = ResumeMatcher()
 
+# Uploads and match jobs live in shared stores, so any API node or worker can handle any request
+blob_store = create_blob_store()
+match_queue = create_match_queue()
+match_results = create_result_store()
+
+# Run matching workers inside the API process unless they are deployed separately (python matching_worker.py)
+if os.getenv('MATCH_WORKERS_INPROCESS', 'true').lower() == 'true':
+    create_worker(resume_matcher).start()
+
+# How long /api/match-resume waits for a worker before answering 202
+MATCH_WAIT_SECONDS = float(os.getenv('MATCH_WAIT_SECONDS', '120'))
+
+# Content-addressed cache of resumes served to recruiters, swept with the matcher's spools
+resume_cache = BlobCache(
+    os.path.join(os.path.dirname(__file__), 'resume_cache'),
+    max_bytes=int(os.getenv('RESUME_CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+    extension='.pdf'
+)
+resume_matcher.sweeper.add(resume_cache.spool)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
 @app.route('/api/resume/download', methods=['POST'])
 def download_and_store_resume():
     try:
@@ -27,20 +49,17 @@ def download_and_store_resume():
         resume_url = data.get('resumeUrl')
         candidate_name = data.get('candidateName')
         job_id = data.get('jobId')
+        application_id = data.get('applicationId')
 
-        if not all([resume_url, candidate_name, job_id]):
+        if not all([resume_url, candidate_name, job_id, application_id]):
             return jsonify({
                 "error": "Missing required parameters",
                 "status": "error"
             }), 400
 
-        # Sanitize candidate name for filename
+        # Sanitize candidate name for the storage key
         sanitized_name = "".join(c for c in candidate_name if c.isalnum() or c in (' ', '-', '_')).strip()
         sanitized_name = sanitized_name.replace(' ', '_')
-        
-        # Create unique filename
-        filename = f"{sanitized_name}_{job_id}_{uuid.uuid4().hex[:8]}.pdf"
-        temp_path = os.path.join(TEMP_DIR, filename)
 
         # Download the resume
         response = requests.get(resume_url)
@@ -50,17 +69,18 @@ def download_and_store_resume():
                 "status": "error"
             }), 500
 
-        # Save to temp file
-        with open(temp_path, 'wb') as f:
-            f.write(response.content)
+        # Store as a content-addressed blob; matching is queued once the job description is stored too
+        blob_key = blob_store.put(response.content)
+        job = match_queue.register_document(application_id, 'resume', blob_key, {"mode": "scores"})
+
+        storage_key = f"temp_resume_{application_id}_{sanitized_name}"
 
-        storage_key = f"temp_resume_{job_id}_{sanitized_name}"
-        
         return jsonify({
             "success": True,
             "message": "Resume downloaded and stored successfully",
             "storageKey": storage_key,
-            "filePath": temp_path
+            "blobKey": blob_key,
+            "matchJobId": job
         })
 
     except Exception as e:
@@ -90,17 +110,32 @@ def download_resume(application_id):
 
         print(f"\nFound resume URL: {resume_url}")
 
-        # Create temporary directory
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, f"resume_{application_id}.pdf")
-        print(f"Created temp directory: {temp_dir}")
-        print(f"Temp file path: {temp_file_path}")
-
-        # Download resume from storage
+        download_name = f"resume_{application_id}.pdf"
+
+        # Serve from the local blob cache when possible; send_file handles Range and uses sendfile
+        cached_path = resume_cache.lookup(resume_url)
+        if cached_path:
+            print(f"\nServing cached resume: {cached_path}")
+            return send_file(
+                cached_path,
+                as_attachment=True,
+                download_name=download_name,
+                mimetype='application/pdf',
+                conditional=True
+            )
+
+        # Otherwise pipe storage bytes straight to the client, caching full downloads on the way
+        range_header = request.headers.get('Range')
+        upstream = open_resume_stream(resume_url, range_header)
+        if upstream is not None:
+            print("\nStreaming resume from storage...")
+            return stream_resume(upstream, resume_url, download_name, cache=not range_header)
+
+        # Fall back to the storage API for objects that are not publicly readable
         print("\nAttempting to download resume from storage...")
-        success = download_resume_from_storage(resume_url, temp_file_path)
+        data = download_resume_bytes(resume_url)
         
-        if not success:
+        if not data:
             print("Failed to download resume from storage")
             return jsonify({
                 "error": "Failed to download resume",
@@ -109,15 +144,14 @@ def download_resume(application_id):
                 "status": "download_failed"
             }), 500
 
-        print(f"\nSuccessfully downloaded resume to {temp_file_path}")
-
         # Send file to client
         print("\nSending file to client...")
         return send_file(
-            temp_file_path,
+            resume_cache.store(resume_url, data),
             as_attachment=True,
-            download_name=f"resume_{application_id}.pdf",
-            mimetype='application/pdf'
+            download_name=download_name,
+            mimetype='application/pdf',
+            conditional=True
         )
 
     except Exception as e:
@@ -129,14 +163,33 @@ def download_resume(application_id):
             "status": "error"
         }), 500
 
-    finally:
-        # Clean up temporary file
-        if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-            print(f"\nCleaning up temp file: {temp_file_path}")
-            os.remove(temp_file_path)
-        if 'temp_dir' in locals() and os.path.exists(temp_dir):
-            print(f"Cleaning up temp directory: {temp_dir}")
-            os.rmdir(temp_dir)
+def stream_resume(upstream, resume_url: str, download_name: str, cache: bool) -> Response:
+    """Relay a streaming storage response to the client, keeping its length and range headers."""
+    headers = {
+        "Content-Disposition": f"attachment; filename={download_name}",
+        "Accept-Ranges": "bytes",
+    }
+    for name in ('Content-Length', 'Content-Range', 'ETag', 'Last-Modified'):
+        if upstream.headers.get(name):
+            headers[name] = upstream.headers[name]
+
+    def relay():
+        try:
+            chunks = upstream.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            if cache and upstream.status_code == 200:
+                chunks = resume_cache.store_stream(resume_url, chunks)
+            for chunk in chunks:
+                yield chunk
+        finally:
+            upstream.close()
+
+    return Response(
+        stream_with_context(relay()),
+        status=upstream.status_code,
+        headers=headers,
+        mimetype='application/pdf',
+        direct_passthrough=True
+    )
 
 @app.route('/api/job-description/download', methods=['POST'])
 def download_and_store_job_description():
@@ -145,8 +198,9 @@ def download_and_store_job_description():
         job_id = data.get('jobId')
         company_name = data.get('companyName')
         position = data.get('position')
+        application_id = data.get('applicationId')
 
-        if not all([job_id, company_name, position]):
+        if not all([job_id, company_name, position, application_id]):
             return jsonify({
                 "error": "Missing required parameters",
                 "status": "error"
@@ -165,37 +219,34 @@ def download_and_store_job_description():
 
         print(f"\nFound job data: {job_data}")
 
-        # Sanitize company name and position for filename
+        # Sanitize company name for the storage key
         sanitized_company = "".join(c for c in company_name if c.isalnum() or c in (' ', '-', '_')).strip()
         sanitized_company = sanitized_company.replace(' ', '_')
-        sanitized_position = "".join(c for c in position if c.isalnum() or c in (' ', '-', '_')).strip()
-        sanitized_position = sanitized_position.replace(' ', '_')
-        
-        # Create unique filename
-        filename = f"{sanitized_company}_{sanitized_position}_{job_id}_{uuid.uuid4().hex[:8]}.txt"
-        temp_path = os.path.join(TEMP_JD_DIR, filename)
-
-        print(f"\nSaving job description to: {temp_path}")
-
-        # Save job description to file
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            f.write(f"Company: {company_name}\n")
-            f.write(f"Position: {position}\n")
-            f.write(f"Job ID: {job_id}\n")
-            f.write("\nDescription:\n")
-            f.write(job_data.get('description', ''))
-            f.write("\n\nRequirements:\n")
-            f.write(job_data.get('requirements', 'N/A'))
-
-        storage_key = f"temp_jd_{job_id}_{sanitized_company}"
-        
-        print(f"\nSuccessfully saved job description")
-        
+
+        content = (
+            f"Company: {company_name}\n"
+            f"Position: {position}\n"
+            f"Job ID: {job_id}\n"
+            "\nDescription:\n"
+            f"{job_data.get('description', '')}"
+            "\n\nRequirements:\n"
+            f"{job_data.get('requirements', 'N/A')}"
+        )
+
+        # Store as a content-addressed blob; matching is queued once the resume is stored too
+        blob_key = blob_store.put(content.encode('utf-8'))
+        job = match_queue.register_document(application_id, 'jd', blob_key, {"mode": "scores"})
+
+        storage_key = f"temp_jd_{application_id}_{sanitized_company}"
+
+        print(f"\nSuccessfully stored job description as blob {blob_key}")
+
         return jsonify({
             "success": True,
             "message": "Job description downloaded and stored successfully",
             "storageKey": storage_key,
-            "filePath": temp_path
+            "blobKey": blob_key,
+            "matchJobId": job
         })
 
     except Exception as e:
@@ -210,79 +261,126 @@ def download_and_store_job_description():
 def match_resume():
     try:
         data = request.json
-        resume_path = data.get('resumePath')
-        jd_path = data.get('jdPath')
+        resume_key = data.get('resumeKey')
+        jd_key = data.get('jdKey')
         application_id = data.get('applicationId')
-
-        if not all([resume_path, jd_path, application_id]):
+        # 'scores' returns as soon as the scores are generated; fetch the analysis later if needed
+        scoring_mode = data.get('mode', 'full')
+        # Recruiter-requested deep analysis always uses the quality model
+        deep_analysis = bool(data.get('deepAnalysis', False))
+        # With wait=false the request returns 202 at once; poll /api/match-results/<application_id>?jobId=<job_id>
+        wait = bool(data.get('wait', True))
+
+        if not all([resume_key, jd_key, application_id]):
             return jsonify({
                 "error": "Missing required parameters",
                 "status": "error"
             }), 400
 
-        print(f"\n=== Starting resume matching ===")
-        print(f"Resume path: {resume_path}")
-        print(f"Job description path: {jd_path}")
+        if scoring_mode not in ('full', 'scores'):
+            return jsonify({
+                "error": "mode must be 'full' or 'scores'",
+                "status": "error"
+            }), 400
+
+        if not is_blob_key(resume_key) or not is_blob_key(jd_key):
+            return jsonify({
+                "error": "resumeKey and jdKey must be blob keys returned by the download endpoints",
+                "status": "error"
+            }), 400
+
+        if not blob_store.exists(resume_key) or not blob_store.exists(jd_key):
+            return jsonify({
+                "error": "Resume or job description blob not found",
+                "status": "not_found"
+            }), 404
+
+        print(f"\n=== Queueing resume matching ===")
+        print(f"Resume blob: {resume_key}")
+        print(f"Job description blob: {jd_key}")
         print(f"Application ID: {application_id}")
 
-        # Match resume against job description
-        result = resume_matcher.match_resume_to_job(resume_path, jd_path)
+        # Any worker can pick the job up; it stores the match percentage and publishes the result
+        job_id = match_queue.enqueue(
+            application_id, resume_key, jd_key, {"mode": scoring_mode, "deep_analysis": deep_analysis}
+        )
+
+        result = match_results.wait(job_id, MATCH_WAIT_SECONDS) if wait else None
+        if result is None:
+            return jsonify({
+                "success": True,
+                "message": "Resume matching queued",
+                "job_id": job_id,
+                "status": "queued"
+            }), 202
 
-        if not result['success']:
+        if not result.get('success'):
             return jsonify({
                 "error": result.get('error', 'Failed to match resume'),
+                "job_id": job_id,
                 "status": "error"
             }), 500
 
-        # Extract match percentage from the result
-        try:
-            # Clean up triple-backtick wrapper if present
-            raw_data = result['matching_result']['data']
-            cleaned_str = raw_data.strip().strip('`')
-
-            if cleaned_str.startswith("json"):
-                cleaned_str = cleaned_str[4:].strip()
-
-            match_result = json.loads(cleaned_str)
-            match_percentage = float(match_result.get("overall_score", 0))
-
-            print(f"Match result type: {type(match_result)}")
-            print(f"Match Percentage: {match_percentage}")
-
-            # Update match percentage in database
-            print(f"\nUpdating match percentage in database...")
-            update_success = update_match_percentage(application_id, match_percentage)
-            
-            if not update_success:
-                print("Failed to update match percentage in database")
-                return jsonify({
-                    "error": "Failed to update match percentage",
-                    "status": "error"
-                }), 500
-
-            print("Successfully updated match percentage")
+        print(f"Match Percentage: {result['match_percentage']}")
+        return jsonify({
+            "success": True,
+            "message": "Resume matched successfully",
+            "result": result['result'],
+            "match_percentage": result['match_percentage']
+        })
+
+    except Exception as e:
+        print(f"Error in match_resume: {str(e)}")
+        print(f"Error type: {type(e)}")
+        return jsonify({
+            "error": str(e),
+            "status": "error"
+        }), 500
+
+@app.route('/api/match-results/<application_id>', methods=['GET'])
+def match_result(application_id):
+    try:
+        # Without jobId this is the latest result for the application, whichever job produced it
+        job_id = request.args.get('jobId')
+        result = match_results.get_job(job_id) if job_id else match_results.get(application_id)
+        if result is None or (job_id and result.get('application_id') != application_id):
             return jsonify({
-                "success": True,
-                "message": "Resume matched successfully",
-                "result": result,
-                "match_percentage": match_percentage
-            })
+                "error": "No match result yet",
+                "application_id": application_id,
+                "status": "not_found"
+            }), 404
 
-        except Exception as e:
-            print(f"Error processing match result: {str(e)}")
+        if not result.get('success'):
             return jsonify({
-                "error": f"Error processing match result: {str(e)}",
+                "error": result.get('error', 'Failed to match resume'),
+                "application_id": application_id,
+                "job_id": result['job_id'],
                 "status": "error"
             }), 500
 
+        return jsonify({
+            "success": True,
+            "application_id": application_id,
+            "job_id": result['job_id'],
+            "result": result['result'],
+            "match_percentage": result['match_percentage'],
+            "completed_at": result['completed_at']
+        })
+
     except Exception as e:
-        print(f"Error in match_resume: {str(e)}")
-        print(f"Error type: {type(e)}")
+        print(f"Error fetching match result: {str(e)}")
         return jsonify({
             "error": str(e),
             "status": "error"
         }), 500
 
+@app.route('/api/match-queue/stats', methods=['GET'])
+def match_queue_stats():
+    return jsonify({
+        "success": True,
+        "stats": match_queue.stats()
+    })
+
 @app.route('/api/update-match-percentage', methods=['POST'])
 def update_match_percentage_endpoint():
     try:
@@ -327,6 +425,164 @@ def update_match_percentage_endpoint():
             "status": "error"
         }), 500
 
+@app.route('/api/jobs/<job_id>/skills', methods=['POST'])
+def precompute_job_skills(job_id):
+    try:
+        print(f"\n=== Precomputing required skills for job {job_id} ===")
+        vector = resume_matcher.precompute_job_skills(job_id)
+
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "required_skills": vector_to_skills(vector)
+        })
+
+    except Exception as e:
+        print(f"Error precomputing job skills: {str(e)}")
+        print(f"Error type: {type(e)}")
+        return jsonify({
+            "error": str(e),
+            "status": "error"
+        }), 500
+
+@app.route('/api/jobs/<job_id>/skills-match', methods=['GET'])
+def job_skills_match(job_id):
+    try:
+        matches = resume_matcher.calculate_job_skills_matches(job_id)
+
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "applications": matches
+        })
+
+    except Exception as e:
+        print(f"Error calculating skills match for job: {str(e)}")
+        print(f"Error type: {type(e)}")
+        return jsonify({
+            "error": str(e),
+            "status": "error"
+        }), 500
+
+def _score_arg(name: str):
+    """Optional finite float query parameter; raises ValueError for anything else"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    score = float(value)
+    if not math.isfinite(score):
+        raise ValueError(f"{name} must be finite")
+    return score
+
+@app.route('/api/jobs/<job_id>/applications', methods=['GET'])
+def ranked_applications(job_id):
+    try:
+        try:
+            limit = min(max(int(request.args.get('limit', 25)), 1), 100)
+            # Parsed explicitly: type=float would silently drop a malformed value and return unfiltered rows
+            min_score = _score_arg('minScore')
+            max_score = _score_arg('maxScore')
+        except ValueError:
+            return jsonify({
+                "error": "Invalid query parameters",
+                "status": "error"
+            }), 400
+
+        try:
+            page = get_ranked_applications(
+                job_id,
+                limit=limit,
+                cursor=request.args.get('cursor'),
+                min_score=min_score,
+                max_score=max_score,
+                applied_after=request.args.get('appliedAfter'),
+                applied_before=request.args.get('appliedBefore')
+            )
+        except ValueError as e:
+            return jsonify({
+                "error": str(e),
+                "status": "error"
+            }), 400
+
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "applications": page['applications'],
+            "nextCursor": page['next_cursor']
+        })
+
+    except Exception as e:
+        print(f"Error fetching ranked applications: {str(e)}")
+        print(f"Error type: {type(e)}")
+        return jsonify({
+            "error": str(e),
+            "status": "error"
+        }), 500
+
+@app.route('/api/applications/<application_id>/analysis', methods=['GET'])
+def application_analysis(application_id):
+    try:
+        application = get_job_application(application_id)
+        if not application:
+            return jsonify({
+                "error": "Application not found",
+                "application_id": application_id,
+                "status": "not_found"
+            }), 404
+
+        resume_content = get_candidate_resume_profile(application['candidate_id'])
+        job_data = get_job_description(application['job_id'])
+        if not resume_content or not job_data:
+            return jsonify({
+                "error": "Candidate profile or job description not available",
+                "application_id": application_id,
+                "status": "not_found"
+            }), 404
+
+        job_requirements = f"{job_data.get('description', '')}\n\nRequirements:\n{job_data.get('requirements') or 'N/A'}"
+        scores = {"overall_score": application.get('match_percentage')}
+        skills_match = resume_matcher.calculate_skills_match(resume_content, application['job_id'])
+        if skills_match is not None:
+            scores["skills_match"] = skills_match['score']
+        deep = request.args.get('deep', 'false').lower() == 'true'
+        result = resume_matcher.generate_detailed_analysis(resume_content, job_requirements, scores, deep=deep)
+
+        if not result['success']:
+            return jsonify({
+                "error": result.get('error', 'Failed to generate analysis'),
+                "status": "error"
+            }), 500
+
+        return jsonify({
+            "success": True,
+            "application_id": application_id,
+            "scores": scores,
+            "detailed_analysis": result['detailed_analysis']
+        })
+
+    except Exception as e:
+        print(f"Error generating match analysis: {str(e)}")
+        print(f"Error type: {type(e)}")
+        return jsonify({
+            "error": str(e),
+            "status": "error"
+        }), 500
+
+@app.route('/api/spool/stats', methods=['GET'])
+def spool_stats():
+    return jsonify({
+        "success": True,
+        "spools": resume_matcher.sweeper.stats(),
+        "resume_cache": resume_cache.stats()
+    })
+
+@app.route('/api/model-stats', methods=['GET'])
+def model_stats():
+    return jsonify({
+        "success": True,
+        "stats": router.get_stats()
+    })
+
 if __name__ == '__main__':
     print("\n=== Starting Flask server ===")
     print(f"Debug mode: {app.debug}")
@@ -0,0 +1,128 @@
+import os
+import uuid
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterable, Iterator
+from spool import Spool, PARTIAL_SUFFIX
+
+
+class BlobCache:
+    """
+    Local disk cache of downloaded files, stored under the SHA-256 of their content.
+
+    Entries are looked up by a source key (e.g. the resume URL) through an index kept in SQLite
+    next to the files, so the cache survives restarts and identical content fetched under different
+    keys is stored once. The cache directory is a Spool: the sweeper keeps it under its size quota,
+    evicting the least recently served files first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = None, extension: str = ''):
+        self.extension = extension
+        self.spool = Spool(directory, max_bytes=max_bytes, max_age=0, on_evict=self._forget_path)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stored': 0}
+
+        # The spool only manages plain files in the directory itself, so the index lives in a subdirectory
+        index_dir = os.path.join(directory, '.index')
+        os.makedirs(index_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(index_dir, 'keys.sqlite3'), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS blob_keys (
+                key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_blob_keys_hash ON blob_keys (content_hash)')
+        self._db.commit()
+
+    @property
+    def directory(self) -> str:
+        return self.spool.directory
+
+    def _path_for_hash(self, content_hash: str) -> str:
+        return self.spool.path_for(f"{content_hash}{self.extension}")
+
+    def _index_get(self, key: str) -> str:
+        with self._lock:
+            row = self._db.execute('SELECT content_hash FROM blob_keys WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _index_execute(self, sql: str, params):
+        with self._lock:
+            self._db.execute(sql, params)
+            self._db.commit()
+
+    def _forget_path(self, path: str):
+        content_hash = os.path.basename(path)
+        if self.extension and content_hash.endswith(self.extension):
+            content_hash = content_hash[:-len(self.extension)]
+        self._index_execute('DELETE FROM blob_keys WHERE content_hash = ?', (content_hash,))
+
+    def lookup(self, key: str) -> str:
+        """Path of the cached file for a key, or None on a miss."""
+        content_hash = self._index_get(key)
+
+        if content_hash:
+            path = self._path_for_hash(content_hash)
+            if os.path.exists(path):
+                self.spool.touch(path)
+                with self._lock:
+                    self._counters['hits'] += 1
+                return path
+            self._index_execute('DELETE FROM blob_keys WHERE key = ?', (key,))
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def store(self, key: str, data: bytes) -> str:
+        """Cache a complete blob and return its path."""
+        for _ in self.store_stream(key, [data]):
+            pass
+        return self._path_for_hash(self._index_get(key))
+
+    def store_stream(self, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Pass chunks through unchanged while writing them to the cache.
+        The entry is only added once the stream has been consumed completely; a failed write just skips caching.
+        """
+        partial_path = os.path.join(self.directory, f".blob.{uuid.uuid4().hex}{PARTIAL_SUFFIX}")
+        digest = hashlib.sha256()
+        f = None
+        completed = False
+        try:
+            try:
+                f = open(partial_path, 'wb')
+            except OSError as e:
+                print(f"Blob cache disabled for this stream: {str(e)}")
+
+            for chunk in chunks:
+                if f is not None:
+                    try:
+                        f.write(chunk)
+                        digest.update(chunk)
+                    except OSError as e:
+                        print(f"Blob cache write failed: {str(e)}")
+                        f.close()
+                        f = None
+                yield chunk
+            completed = True
+        finally:
+            if f is not None:
+                f.close()
+                if completed:
+                    content_hash = digest.hexdigest()
+                    os.replace(partial_path, self._path_for_hash(content_hash))
+                    self._index_execute('INSERT OR REPLACE INTO blob_keys VALUES (?, ?)', (key, content_hash))
+                    with self._lock:
+                        self._counters['stored'] += 1
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            indexed_keys = self._db.execute('SELECT COUNT(*) FROM blob_keys').fetchone()[0]
+            counters = dict(self._counters, indexed_keys=indexed_keys)
+        return dict(self.spool.stats(), **counters)
@@ -0,0 +1,170 @@
+import os
+import re
+import time
+import hashlib
+import importlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Set
+from spool import Spool, PARTIAL_GRACE_SECONDS, is_partial_file
+
+
+_BLOB_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Blobs no job still needs are removed once they have not been stored for this long
+BLOB_TTL_SECONDS = int(os.getenv('BLOB_TTL_SECONDS', 24 * 3600))
+
+
+def blob_key(data: bytes) -> str:
+    """Content address of a blob."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_blob_key(key) -> bool:
+    """Whether key is a well-formed content address (lowercase hex SHA-256)."""
+    return isinstance(key, str) and _BLOB_KEY_PATTERN.match(key) is not None
+
+
+def check_blob_key(key) -> str:
+    """Reject anything but a content address, so keys can never name paths outside the store."""
+    if not is_blob_key(key):
+        raise ValueError("Invalid blob key")
+    return key
+
+
+class BlobStore(ABC):
+    """
+    Content-addressed storage for uploaded resumes and job descriptions.
+    Keys are the SHA-256 of the content, so any node can store or fetch a blob without sharing local paths.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Store a blob and return its key."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Blob content, or None if the key is unknown."""
+
+    def exists(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    @abstractmethod
+    def sweep(self, keep: Set[str], max_age: float = BLOB_TTL_SECONDS) -> int:
+        """Remove blobs not in keep that were last stored more than max_age seconds ago; returns the count."""
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a directory; node-local unless BLOB_STORE_PATH is a mount shared by every node."""
+
+    def __init__(self, root: str = None):
+        self.root = root or os.getenv('BLOB_STORE_PATH', os.path.join(os.path.dirname(__file__), 'blobs'))
+        os.makedirs(self.root, exist_ok=True)
+
+    def _spool_for(self, key: str) -> Spool:
+        # Fan out over 256 subdirectories; expiry is by reference in sweep(), so the spool quotas are off
+        return Spool(os.path.join(self.root, key[:2]), max_bytes=float('inf'), max_files=float('inf'), max_age=0)
+
+    def put(self, data: bytes) -> str:
+        key = check_blob_key(blob_key(data))
+        spool = self._spool_for(key)
+        path = spool.path_for(key)
+        if os.path.exists(path):
+            # Storing the same content again restarts its TTL
+            spool.touch(path)
+        else:
+            spool.write_atomic(key, data)
+        return key
+
+    def get(self, key: str) -> bytes:
+        check_blob_key(key)
+        path = os.path.join(self.root, key[:2], key)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+
+    def exists(self, key: str) -> bool:
+        check_blob_key(key)
+        return os.path.exists(os.path.join(self.root, key[:2], key))
+
+    def sweep(self, keep: Set[str], max_age: float = BLOB_TTL_SECONDS) -> int:
+        now = time.time()
+        removed = 0
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    age = now - os.path.getmtime(path)
+                except OSError:
+                    continue
+                if is_partial_file(path):
+                    expired = age > PARTIAL_GRACE_SECONDS
+                else:
+                    expired = filename not in keep and age > max_age
+                if expired:
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+
+class SupabaseBlobStore(BlobStore):
+    """Blobs in a Supabase storage bucket, shared by every node using the same project."""
+
+    def __init__(self, bucket: str = None):
+        from db import supabase
+        self.bucket = bucket or os.getenv('BLOB_STORE_BUCKET', 'match-blobs')
+        self.storage = supabase.storage.from_(self.bucket)
+
+    def put(self, data: bytes) -> str:
+        key = check_blob_key(blob_key(data))
+        # Upsert, so storing the same content again refreshes updated_at and restarts its TTL
+        self.storage.upload(key, data, {"upsert": "true"})
+        return key
+
+    def get(self, key: str) -> bytes:
+        check_blob_key(key)
+        try:
+            return self.storage.download(key) or None
+        except Exception:
+            return None
+
+    def sweep(self, keep: Set[str], max_age: float = BLOB_TTL_SECONDS) -> int:
+        now = time.time()
+        expired = []
+        offset = 0
+        while True:
+            entries = self.storage.list(None, {"limit": 1000, "offset": offset}) or []
+            for entry in entries:
+                stored_at = entry.get('updated_at') or entry.get('created_at')
+                if not is_blob_key(entry.get('name')) or entry['name'] in keep or not stored_at:
+                    continue
+                stored_at = datetime.fromisoformat(stored_at.replace('Z', '+00:00')).timestamp()
+                if now - stored_at > max_age:
+                    expired.append(entry['name'])
+            if len(entries) < 1000:
+                break
+            offset += len(entries)
+
+        for start in range(0, len(expired), 100):
+            self.storage.remove(expired[start:start + 100])
+        return len(expired)
+
+
+def create_blob_store() -> BlobStore:
+    """
+    Blob store selected by BLOB_STORE_BACKEND: 'local' (default), 'supabase',
+    or 'package.module:ClassName' for any other BlobStore implementation.
+    """
+    backend = os.getenv('BLOB_STORE_BACKEND', 'local')
+    if backend == 'local':
+        return LocalBlobStore()
+    if backend == 'supabase':
+        return SupabaseBlobStore()
+
+    module_name, _, class_name = backend.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)()
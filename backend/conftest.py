@@ -0,0 +1,6 @@
+import os
+
+# Tests run against the in-memory Supabase and Gemini stand-ins from loadtest/, never a real project
+os.environ['SUPABASE_BACKEND'] = 'fake'
+os.environ['GEMINI_BACKEND'] = 'fake'
+os.environ['FAKE_STORAGE_SERVE'] = 'false'
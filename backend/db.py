@@ -1,17 +1,33 @@
-from supabase import create_client
 import os
 from dotenv import load_dotenv
+from datetime import datetime
 import time
 import json
+import math
+import uuid
+import base64
+import requests
 
 load_dotenv()
 
+# SUPABASE_BACKEND=fake swaps in the in-memory stand-in used for load testing (see loadtest/)
+if os.getenv("SUPABASE_BACKEND", "live") == "fake":
+    from loadtest.fake_supabase import create_client
+else:
+    from supabase import create_client
+
 # Initialize Supabase client
 supabase = create_client(
     os.getenv("SUPABASE_URL"),
     os.getenv("SUPABASE_KEY")
 )
 
+# PostgREST returns at most this many rows per request (Supabase's default max rows)
+PAGE_SIZE = 1000
+
+# IDs per in_() filter; every ID goes into the request URL
+IN_FILTER_CHUNK_SIZE = 200
+
 def get_job_application_resume(application_id: str, max_retries=3, retry_delay=2):
     """
     Fetch resume URL from job applications table for a specific application
@@ -59,19 +75,19 @@ def get_job_application_resume(application_id: str, max_retries=3, retry_delay=2
                 continue
             return None
 
-def download_resume_from_storage(resume_url: str, temp_path: str):
+def download_resume_bytes(resume_url: str):
     """
-    Download resume from Supabase storage bucket
+    Download resume bytes from Supabase storage bucket
     """
     try:
         if not resume_url:
-            return False
+            return None
             
         # Extract bucket name and file path from URL
         # Assuming URL format: https://<project>.supabase.co/storage/v1/object/public/<bucket>/<path>
         parts = resume_url.split('/')
         if len(parts) < 2:
-            return False
+            return None
             
         bucket_name = parts[-2]
         file_path = parts[-1]
@@ -79,17 +95,30 @@ def download_resume_from_storage(resume_url: str, temp_path: str):
         # Download file from storage
         response = supabase.storage.from_(bucket_name).download(file_path)
         
-        if not response:
-            return False
-            
-        # Save to temp file
-        with open(temp_path, 'wb') as f:
-            f.write(response)
-            
-        return True
+        return response or None
         
     except Exception:
-        return False
+        return None
+
+def open_resume_stream(resume_url: str, range_header: str = None):
+    """
+    Open a streaming HTTP response for a public resume URL, forwarding an optional Range header.
+    Returns None if the object cannot be fetched this way; the caller must close the response.
+    """
+    try:
+        headers = {'Accept-Encoding': 'identity'}
+        if range_header:
+            headers['Range'] = range_header
+
+        response = requests.get(resume_url, headers=headers, stream=True, timeout=30)
+        if response.status_code not in (200, 206):
+            response.close()
+            return None
+
+        return response
+
+    except Exception:
+        return None
 
 def get_job_description(job_id: str, max_retries=3, retry_delay=2):
     """
@@ -138,9 +167,12 @@ def get_job_description(job_id: str, max_retries=3, retry_delay=2):
                 continue
             return None
 
-def update_match_percentage(application_id: str, match_percentage: float) -> bool:
+def update_match_percentage(application_id: str, match_percentage: float, raw_score: float = None,
+                            model: str = None, prompt_version: int = None) -> bool:
     """
-    Update the match percentage for a job application
+    Update the match percentage for a job application.
+    A model score also records the raw score it was calibrated from, so later calibrations can rescale it;
+    a percentage set without one is left alone by rescale_match_percentages.
     """
     try:
         print(f"\n=== Updating match percentage in database ===")
@@ -149,7 +181,10 @@ def update_match_percentage(application_id: str, match_percentage: float) -> boo
 
         print("Executing database update query...")
         response = supabase.table('job_applications').update({
-            "match_percentage": match_percentage
+            "match_percentage": match_percentage,
+            "raw_match_score": raw_score,
+            "match_score_model": model,
+            "match_prompt_version": prompt_version
         }).eq('id', application_id).execute()
 
         if not response.data:
@@ -171,33 +206,210 @@ def update_match_percentage(application_id: str, match_percentage: float) -> boo
         print(f"Error type: {type(e)}")
         return False
 
-def get_application_id_by_job_id(job_id: str) -> str:
+def rescale_match_percentages(model: str, prompt_version: int, calibrate) -> int:
     """
-    Get the application ID for a given job ID
+    Recompute match_percentage = calibrate(raw_match_score) for every application scored by a model and
+    prompt version, so applicants scored before and after a refit share one scale. Returns rows updated.
+    Rows with the same raw score are updated together, so this is one request per distinct raw score.
+    """
+    # Raw scores are 0-100, so the gte filter also skips rows without one
+    raw_scores = set()
+    offset = 0
+    while True:
+        page = supabase.table('job_applications').select('raw_match_score') \
+            .eq('match_score_model', model).eq('match_prompt_version', prompt_version) \
+            .gte('raw_match_score', 0).order('id').range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        raw_scores.update(row['raw_match_score'] for row in page)
+        offset += len(page)
+        if len(page) < PAGE_SIZE:
+            break
+
+    updated = 0
+    for raw_score in sorted(raw_scores):
+        response = supabase.table('job_applications').update({
+            "match_percentage": calibrate(raw_score)
+        }).eq('match_score_model', model).eq('match_prompt_version', prompt_version) \
+            .eq('raw_match_score', raw_score).execute()
+        updated += len(response.data or [])
+    return updated
+
+def get_job_application(application_id: str):
+    """
+    Fetch the job, candidate and resume for a job application
     """
     try:
-        job_id = str(job_id).strip()
-        
-        # First verify if the job exists
-        check_response = supabase.table('jobs').select('id').eq('id', job_id).execute()
-        
-        if not check_response.data:
+        response = supabase.table('job_applications').select('id, job_id, candidate_id, resume_url, match_percentage').eq('id', application_id).execute()
+
+        if not response.data:
             return None
-            
-        # Get the application ID
-        response = supabase.table('job_applications').select('id, job_id, applied_at').eq('job_id', job_id).execute()
-        
+
+        return response.data[0]
+
+    except Exception:
+        return None
+
+def get_candidate_resume_profile(candidate_id: str):
+    """
+    Fetch the stored parsed resume profile for a candidate
+    """
+    try:
+        response = supabase.table('candidate_profiles').select('parsed_profile').eq('user_id', candidate_id).execute()
+
         if not response.data:
             return None
-            
-        if len(response.data) == 0:
+
+        profile = response.data[0].get('parsed_profile')
+        if isinstance(profile, str):
+            profile = json.loads(profile)
+        return profile
+
+    except Exception:
+        return None
+
+def save_candidate_resume_profile(candidate_id: str, profile: dict) -> bool:
+    """
+    Store the parsed resume profile for a candidate so it can be reused across applications
+    """
+    try:
+        response = supabase.table('candidate_profiles').update({
+            "parsed_profile": profile,
+            "parsed_profile_version": profile.get('version')
+        }).eq('user_id', candidate_id).execute()
+
+        return bool(response.data)
+
+    except Exception as e:
+        print(f"Error saving parsed resume profile: {str(e)}")
+        return False
+
+def get_job_skill_vector(job_id: str):
+    """
+    Fetch the precomputed required-skill vector for a job
+    """
+    try:
+        response = supabase.table('jobs').select('required_skills, required_skill_vector, skill_taxonomy_version').eq('id', job_id).execute()
+
+        if not response.data:
             return None
-            
-        # Get the most recent application
-        applications = sorted(response.data, key=lambda x: x.get('applied_at', ''), reverse=True)
-        application_id = applications[0]['id']
-        
-        return application_id
-        
+
+        return response.data[0]
+
     except Exception:
         return None
+
+def save_job_skill_vector(job_id: str, required_skills: list, skill_vector: str, taxonomy_version: int) -> bool:
+    """
+    Store the required skills of a job and their skill vector
+    """
+    try:
+        response = supabase.table('jobs').update({
+            "required_skills": required_skills,
+            "required_skill_vector": skill_vector,
+            "skill_taxonomy_version": taxonomy_version
+        }).eq('id', job_id).execute()
+
+        return bool(response.data)
+
+    except Exception as e:
+        print(f"Error saving job skill vector: {str(e)}")
+        return False
+
+def get_job_application_candidates(job_id: str) -> list:
+    """
+    Fetch the application and candidate IDs of every application for a job, a page at a time.
+    Errors propagate, so a failed page is never mistaken for a job with fewer applicants.
+    """
+    applications = []
+    while True:
+        response = supabase.table('job_applications').select('id, candidate_id').eq('job_id', job_id) \
+            .order('id').range(len(applications), len(applications) + PAGE_SIZE - 1).execute()
+        page = response.data or []
+        applications.extend(page)
+        if len(page) < PAGE_SIZE:
+            return applications
+
+def get_candidate_resume_profiles(candidate_ids: list) -> dict:
+    """
+    Fetch stored parsed resume profiles for many candidates, keyed by candidate ID.
+    IDs are sent in chunks to keep request URLs short; errors propagate.
+    """
+    candidate_ids = list(candidate_ids)
+    profiles = {}
+    for start in range(0, len(candidate_ids), IN_FILTER_CHUNK_SIZE):
+        response = supabase.table('candidate_profiles').select('user_id, parsed_profile') \
+            .in_('user_id', candidate_ids[start:start + IN_FILTER_CHUNK_SIZE]).execute()
+
+        for row in response.data or []:
+            profile = row.get('parsed_profile')
+            if isinstance(profile, str):
+                profile = json.loads(profile)
+            if profile:
+                profiles[row['user_id']] = profile
+    return profiles
+
+def _encode_cursor(match_percentage, application_id: str) -> str:
+    """Opaque keyset cursor pointing just after the given row"""
+    payload = json.dumps([match_percentage, application_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor: str):
+    """Inverse of _encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        match_percentage, application_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if isinstance(match_percentage, bool) or not isinstance(match_percentage, (int, float)) \
+            or not math.isfinite(match_percentage) or not isinstance(application_id, str):
+        raise ValueError("Invalid cursor")
+    # Both values are interpolated into a PostgREST filter, so only accept what _encode_cursor produces
+    try:
+        application_id = str(uuid.UUID(application_id))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    return match_percentage, application_id
+
+def _check_timestamp(value: str, name: str) -> str:
+    """Reject timestamps PostgREST would fail on; accepts ISO 8601 with an optional trailing Z"""
+    try:
+        datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith(('Z', 'z')) else value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: expected an ISO 8601 timestamp")
+    return value
+
+def get_ranked_applications(job_id: str, limit: int = 25, cursor: str = None, min_score: float = None,
+                            max_score: float = None, applied_after: str = None, applied_before: str = None) -> dict:
+    """
+    Fetch one page of applications for a job ordered by match percentage (best first).
+    Uses keyset pagination on (match_percentage, id), served by idx_job_applications_job_match.
+    """
+    query = supabase.table('job_applications').select(
+        'id, job_id, candidate_id, status, match_percentage, skills, experience_years, applied_at, resume_url'
+    ).eq('job_id', job_id)
+
+    if min_score is not None:
+        query = query.gte('match_percentage', min_score)
+    if max_score is not None:
+        query = query.lte('match_percentage', max_score)
+    if applied_after:
+        query = query.gte('applied_at', _check_timestamp(applied_after, 'appliedAfter'))
+    if applied_before:
+        query = query.lt('applied_at', _check_timestamp(applied_before, 'appliedBefore'))
+
+    if cursor:
+        last_score, last_id = _decode_cursor(cursor)
+        query = query.or_(f"match_percentage.lt.{last_score},and(match_percentage.eq.{last_score},id.lt.{last_id})")
+
+    # Fetch one extra row to know whether there is a next page
+    response = query.order('match_percentage', desc=True).order('id', desc=True).limit(limit + 1).execute()
+    rows = response.data or []
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(last.get('match_percentage'), last['id'])
+
+    return {
+        "applications": rows,
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,102 @@
+"""
+Stand-in for the google.generativeai calls the backend makes.
+
+model_router.py uses it when GEMINI_BACKEND=fake. Responses are deterministic for a given prompt and
+shaped like the real ones (JSON scores, extraction JSON or plain text). Latency and errors are set with
+FAKE_GEMINI_LATENCY_MS / _JITTER_MS / _ERROR_RATE (time to first chunk) and FAKE_GEMINI_CHUNK_LATENCY_MS.
+"""
+import os
+import re
+import json
+import random
+import hashlib
+from loadtest.faults import FaultInjector
+
+# Roughly 4 characters per token, as for English text
+CHARS_PER_TOKEN = 4
+CHUNK_SIZE = 48
+
+_faults = None
+
+
+def configure(**kwargs):
+    """Accepts and ignores the real SDK's settings (api_key etc.)."""
+    global _faults
+    _faults = FaultInjector.from_env('FAKE_GEMINI', 'gemini', latency_ms=300)
+
+
+def _get_faults() -> FaultInjector:
+    if _faults is None:
+        configure()
+    return _faults
+
+
+class UsageMetadata:
+    def __init__(self, prompt: str, text: str):
+        self.prompt_token_count = len(prompt) // CHARS_PER_TOKEN
+        self.candidates_token_count = len(text) // CHARS_PER_TOKEN
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class GenerateContentResponse:
+    def __init__(self, text: str, usage_metadata: UsageMetadata = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+def _respond(prompt: str) -> str:
+    """Deterministic reply in the format the prompt asks for."""
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+
+    if 'plain text only' in prompt:
+        return ' '.join(['The resume shows a reasonable match for this role.'] * rng.randint(5, 15))
+
+    if 'overall_score' in prompt:
+        return '```json\n' + json.dumps({
+            'overall_score': rng.randint(20, 95),
+            'experience_match': rng.randint(20, 95),
+            'education_match': rng.randint(20, 95),
+            'detailed_analysis': ' '.join(
+                ['The candidate covers most of the required skills and has relevant experience.'] * 6
+            ),
+        }, indent=2) + '\n```'
+
+    keys_line = re.search(r'JSON object with exactly these keys: ([\w, ]+)', prompt)
+    if keys_line:
+        return json.dumps({key.strip(): [] for key in keys_line.group(1).split(',') if key.strip()})
+
+    if 'required_skills, required_experience' in prompt:
+        return json.dumps({
+            'required_skills': [],
+            'required_experience': f'{rng.randint(1, 8)}+ years',
+            'required_education': "Bachelor's degree in Computer Science or equivalent",
+            'responsibilities': ['Design, build and operate production services'],
+        })
+
+    return 'OK'
+
+
+class GenerativeModel:
+    def __init__(self, model_name: str = 'models/gemini-1.5-flash', **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, contents, stream: bool = False, generation_config=None, **kwargs):
+        prompt = contents if isinstance(contents, str) else str(contents)
+        faults = _get_faults()
+        faults.call(f'{self.model_name} generate_content')
+        text = _respond(prompt)
+
+        if not stream:
+            faults.delay(len(text) // CHUNK_SIZE * float(os.getenv('FAKE_GEMINI_CHUNK_LATENCY_MS', 20)))
+            return GenerateContentResponse(text, UsageMetadata(prompt, text))
+        return self._stream(prompt, text, faults)
+
+    def _stream(self, prompt: str, text: str, faults: FaultInjector):
+        chunk_latency = float(os.getenv('FAKE_GEMINI_CHUNK_LATENCY_MS', 20))
+        for start in range(0, len(text), CHUNK_SIZE):
+            if start:
+                faults.delay(chunk_latency)
+            end = start + CHUNK_SIZE
+            # Like the real API, only the final chunk carries the full usage metadata
+            usage = UsageMetadata(prompt, text) if end >= len(text) else None
+            yield GenerateContentResponse(text[start:end], usage)
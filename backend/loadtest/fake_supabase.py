@@ -0,0 +1,414 @@
+"""
+In-memory stand-in for the Supabase client calls the backend makes.
+
+db.py uses it when SUPABASE_BACKEND=fake. Tables are seeded with a deterministic fixture of jobs,
+candidates and applications, and resumes are served over HTTP the way public storage URLs are,
+so the API can be load tested without touching a real project.
+"""
+import os
+import copy
+import uuid
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from loadtest.faults import FaultInjector, InjectedError
+
+DEFAULT_STORAGE_PORT = 54330
+
+# Supabase's default max rows per request
+MAX_ROWS = 1000
+RESUME_BUCKET = 'resumes'
+
+# uuid5 namespace so every process builds the same fixture IDs
+FIXTURE_NAMESPACE = uuid.UUID('5b1f0c1e-7a52-4c1d-9a4e-3f6d2c8b9e10')
+
+FIXTURE_SKILLS = [
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'Go', 'SQL', 'React', 'Node.js', 'Django', 'Flask',
+    'FastAPI', 'Spring Boot', 'GraphQL', 'Pandas', 'TensorFlow', 'PyTorch', 'Docker', 'Kubernetes', 'AWS',
+    'PostgreSQL', 'MongoDB', 'Redis', 'Git', 'Machine Learning',
+]
+FIXTURE_COMPANIES = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises']
+FIXTURE_POSITIONS = ['Backend Engineer', 'Frontend Engineer', 'Data Scientist', 'ML Engineer', 'DevOps Engineer']
+FIXTURE_NAMES = ['Asha', 'Ben', 'Chen', 'Divya', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas']
+
+
+def fixture_id(kind: str, index: int) -> str:
+    return str(uuid.uuid5(FIXTURE_NAMESPACE, f'{kind}-{index}'))
+
+
+def storage_base_url(port: int = None) -> str:
+    port = port or int(os.getenv('FAKE_STORAGE_PORT', DEFAULT_STORAGE_PORT))
+    return f'http://127.0.0.1:{port}/storage/v1/object/public'
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    """Single-page PDF with one line of Helvetica text per entry, readable by PyPDF2."""
+    text = ['BT', '/F1 10 Tf', '12 TL', '50 780 Td']
+    for line in lines:
+        escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+        text.append(f'({escaped}) Tj T*')
+    text.append('ET')
+    stream = '\n'.join(text).encode('latin-1', 'replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream',
+    ]
+
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+
+    xref = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        pdf += f'{offset:010d} 00000 n \n'.encode()
+    pdf += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return pdf
+
+
+def build_fixture(applications: int = None, jobs: int = None, storage_url: str = None, seed: int = 0) -> Dict:
+    """
+    Deterministic tables and storage objects: `jobs` jobs and `applications` applications,
+    one candidate per application. Sizes default to FAKE_SUPABASE_APPLICATIONS / FAKE_SUPABASE_JOBS.
+    """
+    applications = applications or int(os.getenv('FAKE_SUPABASE_APPLICATIONS', 200))
+    jobs = jobs or int(os.getenv('FAKE_SUPABASE_JOBS', 10))
+    storage_url = storage_url or storage_base_url()
+    rng = random.Random(seed)
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+    tables = {'jobs': [], 'candidate_profiles': [], 'job_applications': []}
+    objects = {}
+
+    for index in range(jobs):
+        skills = rng.sample(FIXTURE_SKILLS, 6)
+        tables['jobs'].append({
+            'id': fixture_id('job', index),
+            'company': FIXTURE_COMPANIES[index % len(FIXTURE_COMPANIES)],
+            'position': FIXTURE_POSITIONS[index % len(FIXTURE_POSITIONS)],
+            'description': f"We are hiring a {FIXTURE_POSITIONS[index % len(FIXTURE_POSITIONS)]} "
+                           f"to build and run production services.",
+            'requirements': "Required Skills:\n" + "\n".join(skills) + f"\n{rng.randint(1, 8)}+ years of experience",
+            'required_skills': None,
+            'required_skill_vector': None,
+            'skill_taxonomy_version': None,
+        })
+
+    for index in range(applications):
+        candidate_id = fixture_id('candidate', index)
+        name = f"{FIXTURE_NAMES[index % len(FIXTURE_NAMES)]} Tester{index}"
+        skills = rng.sample(FIXTURE_SKILLS, rng.randint(3, 10))
+        start_year = rng.randint(2008, 2021)
+        path = f'{candidate_id}.pdf'
+        objects[(RESUME_BUCKET, path)] = make_pdf([
+            name,
+            'Summary',
+            f'Software engineer with a focus on {skills[0]} and {skills[-1]}.',
+            'Skills',
+            ', '.join(skills),
+            'Experience',
+            f'Engineer, {FIXTURE_COMPANIES[index % len(FIXTURE_COMPANIES)]}  Jan {start_year} - Present',
+            f'Built services in {skills[0]} used by thousands of customers.',
+            'Education',
+            'B.Sc. Computer Science',
+        ])
+        resume_url = f'{storage_url}/{RESUME_BUCKET}/{path}'
+
+        tables['candidate_profiles'].append({
+            'user_id': candidate_id,
+            'full_name': name,
+            'resume_url': resume_url,
+            'skills': skills,
+            'experience_years': 2024 - start_year,
+            'parsed_profile': None,
+            'parsed_profile_version': None,
+        })
+        tables['job_applications'].append({
+            'id': fixture_id('application', index),
+            'job_id': tables['jobs'][index % jobs]['id'],
+            'candidate_id': candidate_id,
+            'status': 'applied',
+            'applied_at': (now - timedelta(minutes=index)).isoformat(),
+            'resume_url': resume_url,
+            'skills': skills,
+            'experience_years': 2024 - start_year,
+            'match_percentage': 0,
+        })
+
+    return {'tables': tables, 'objects': objects}
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+def _coerce(value, like):
+    """Convert a filter value taken from a PostgREST string to the type of the column value."""
+    if isinstance(like, bool) or like is None:
+        return value
+    if isinstance(like, (int, float)) and isinstance(value, str):
+        return float(value)
+    return value
+
+
+def _compare(row_value, op: str, value) -> bool:
+    if op == 'in':
+        return row_value in value
+    if row_value is None:
+        return op == 'eq' and value is None
+    value = _coerce(value, row_value)
+    if op == 'eq':
+        return row_value == value
+    if op == 'neq':
+        return row_value != value
+    if op == 'lt':
+        return row_value < value
+    if op == 'lte':
+        return row_value <= value
+    if op == 'gt':
+        return row_value > value
+    if op == 'gte':
+        return row_value >= value
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+def _split_top_level(expression: str) -> List[str]:
+    parts, depth, current = [], 0, ''
+    for char in expression:
+        if char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        depth += (char == '(') - (char == ')')
+        current += char
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _parse_logic(expression: str, combinator: str = 'or'):
+    """Parse a PostgREST logic filter such as "a.lt.1,and(a.eq.1,id.lt.x)" into a predicate."""
+    predicates = []
+    for part in _split_top_level(expression):
+        if part.startswith(('and(', 'or(')) and part.endswith(')'):
+            inner_combinator, _, inner = part.partition('(')
+            predicates.append(_parse_logic(inner[:-1], inner_combinator))
+            continue
+        column, op, value = part.split('.', 2)
+        predicates.append(lambda row, c=column, o=op, v=value: _compare(row.get(c), o, v))
+
+    if combinator == 'and':
+        return lambda row: all(predicate(row) for predicate in predicates)
+    return lambda row: any(predicate(row) for predicate in predicates)
+
+
+class FakeQuery:
+    """Chainable query builder covering the postgrest-py methods used in db.py."""
+
+    def __init__(self, client: 'FakeSupabase', table: str):
+        self.client = client
+        self.table = table
+        self.columns = None
+        self.values = None
+        self.filters = []
+        self.orders = []
+        self.row_offset = 0
+        self.row_limit = None
+
+    def select(self, columns: str = '*'):
+        self.columns = None if columns.strip() == '*' else [column.strip() for column in columns.split(',')]
+        return self
+
+    def update(self, values: Dict):
+        self.values = dict(values)
+        return self
+
+    def _filter(self, column: str, op: str, value):
+        self.filters.append(lambda row: _compare(row.get(column), op, value))
+        return self
+
+    def eq(self, column: str, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value):
+        return self._filter(column, 'neq', value)
+
+    def lt(self, column: str, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value):
+        return self._filter(column, 'lte', value)
+
+    def gt(self, column: str, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value):
+        return self._filter(column, 'gte', value)
+
+    def in_(self, column: str, values):
+        return self._filter(column, 'in', list(values))
+
+    def or_(self, expression: str):
+        self.filters.append(_parse_logic(expression))
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count: int):
+        self.row_limit = count
+        return self
+
+    def range(self, start: int, end: int):
+        self.row_offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    def execute(self) -> FakeResponse:
+        self.client.faults.call(f'{self.table} query')
+        with self.client.lock:
+            rows = [row for row in self.client.tables.get(self.table, []) if all(f(row) for f in self.filters)]
+
+            if self.values is not None:
+                for row in rows:
+                    row.update(self.values)
+                return FakeResponse([copy.deepcopy(row) for row in rows])
+
+            # Stable sorts from the last key to the first give a multi-column ORDER BY; NULLs sort last
+            for column, desc in reversed(self.orders):
+                present = sorted((row for row in rows if row.get(column) is not None),
+                                 key=lambda row: row[column], reverse=desc)
+                rows = present + [row for row in rows if row.get(column) is None]
+            # Like PostgREST, never return more than MAX_ROWS rows from one request
+            rows = rows[self.row_offset:][:min(self.row_limit or MAX_ROWS, MAX_ROWS)]
+
+            if self.columns is None:
+                return FakeResponse([copy.deepcopy(row) for row in rows])
+            return FakeResponse([{column: copy.deepcopy(row.get(column)) for column in self.columns} for row in rows])
+
+
+class FakeBucket:
+    def __init__(self, client: 'FakeSupabase', bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def download(self, path: str) -> bytes:
+        self.client.storage_faults.call(f'download {self.bucket}/{path}')
+        with self.client.lock:
+            data = self.client.objects.get((self.bucket, path))
+        if data is None:
+            raise InjectedError(f"Object not found: {self.bucket}/{path}")
+        return data
+
+    def upload(self, path: str, data: bytes, file_options: Dict = None):
+        self.client.storage_faults.call(f'upload {self.bucket}/{path}')
+        with self.client.lock:
+            if (self.bucket, path) in self.client.objects:
+                raise InjectedError(f"Duplicate: {self.bucket}/{path} already exists")
+            self.client.objects[(self.bucket, path)] = bytes(data)
+        return {'Key': f'{self.bucket}/{path}'}
+
+
+class FakeStorage:
+    def __init__(self, client: 'FakeSupabase'):
+        self.client = client
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self.client, bucket)
+
+
+class FakeSupabase:
+    """
+    Supabase client stand-in. Latency and errors are configured through the environment:
+    FAKE_SUPABASE_LATENCY_MS / _JITTER_MS / _ERROR_RATE for table queries and
+    FAKE_STORAGE_LATENCY_MS / _JITTER_MS / _ERROR_RATE for storage downloads and uploads.
+    """
+
+    def __init__(self, fixture: Dict = None):
+        fixture = fixture or build_fixture()
+        self.tables = fixture['tables']
+        self.objects = fixture['objects']
+        self.lock = threading.RLock()
+        self.faults = FaultInjector.from_env('FAKE_SUPABASE', 'supabase')
+        self.storage_faults = FaultInjector.from_env('FAKE_STORAGE', 'storage')
+        self.storage = FakeStorage(self)
+        self._server = None
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def serve_storage(self, port: int = None) -> ThreadingHTTPServer:
+        """Serve storage objects at their public URLs, as requests.get(resume_url) expects."""
+        if self._server is not None:
+            return self._server
+
+        client = self
+        port = port if port is not None else int(os.getenv('FAKE_STORAGE_PORT', DEFAULT_STORAGE_PORT))
+
+        class StorageHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                prefix = '/storage/v1/object/public/'
+                bucket, _, path = self.path[len(prefix):].partition('/') if self.path.startswith(prefix) else ('', '', '')
+                client.storage_faults.delay()
+                if client.storage_faults.should_fail():
+                    self.send_error(503, 'Injected storage failure')
+                    return
+
+                with client.lock:
+                    data = client.objects.get((bucket, path))
+                if data is None:
+                    self.send_error(404, 'Object not found')
+                    return
+
+                status, start, end = 200, 0, len(data) - 1
+                range_header = self.headers.get('Range', '')
+                if range_header.startswith('bytes='):
+                    first, _, last = range_header[len('bytes='):].partition('-')
+                    try:
+                        start = int(first) if first else max(len(data) - int(last), 0)
+                        end = min(int(last), len(data) - 1) if first and last else end
+                        status = 206
+                    except ValueError:
+                        pass
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/pdf')
+                self.send_header('Content-Length', str(end - start + 1))
+                self.send_header('Accept-Ranges', 'bytes')
+                if status == 206:
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+                self.end_headers()
+                self.wfile.write(data[start:end + 1])
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), StorageHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='fake-storage', daemon=True).start()
+        return self._server
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def create_client(url: str = None, key: str = None) -> FakeSupabase:
+    """Drop-in for supabase.create_client; every caller in the process shares one seeded client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FakeSupabase()
+            if os.getenv('FAKE_STORAGE_SERVE', 'true').lower() == 'true':
+                _client.serve_storage()
+        return _client
@@ -0,0 +1,52 @@
+import os
+import time
+import random
+import threading
+
+
+class InjectedError(Exception):
+    """Failure raised by a stand-in to simulate an upstream error."""
+
+
+class FaultInjector:
+    """
+    Latency and error injection for one stand-in service.
+    Each call sleeps latency_ms +/- jitter_ms and then fails with probability error_rate.
+    """
+
+    def __init__(self, name: str, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 seed: int = None):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, prefix: str, name: str, latency_ms: float = 0) -> 'FaultInjector':
+        """Read <prefix>_LATENCY_MS, <prefix>_JITTER_MS and <prefix>_ERROR_RATE."""
+        return cls(
+            name,
+            latency_ms=float(os.getenv(f'{prefix}_LATENCY_MS', latency_ms)),
+            jitter_ms=float(os.getenv(f'{prefix}_JITTER_MS', 0)),
+            error_rate=float(os.getenv(f'{prefix}_ERROR_RATE', 0)),
+            seed=int(os.getenv('FAKE_SEED')) if os.getenv('FAKE_SEED') else None
+        )
+
+    def delay(self, latency_ms: float = None):
+        latency_ms = self.latency_ms if latency_ms is None else latency_ms
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        if latency_ms + jitter > 0:
+            time.sleep((latency_ms + jitter) / 1000)
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def call(self, operation: str):
+        """Apply latency, then raise InjectedError if this call is picked to fail."""
+        self.delay()
+        if self.should_fail():
+            raise InjectedError(f"Injected {self.name} failure in {operation}")
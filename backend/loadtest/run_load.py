@@ -0,0 +1,361 @@
+"""
+Load generator for the Flask API.
+
+Replays the candidate apply flow from JobsList.tsx (resume download -> JD download ->
+update-match-percentage) from concurrent virtual users and reports latency percentiles,
+throughput and error rates per endpoint. Matching runs asynchronously on the queue, so each
+user then polls /api/match-results for its job and the report adds time-to-score percentiles
+and match throughput; pass --score-timeout 0 to time the HTTP endpoints only.
+
+By default the API is started in this process against the Supabase and Gemini stand-ins:
+
+    python loadtest/run_load.py --concurrency 20 --duration 60 --gemini-latency-ms 800
+
+To load an API started elsewhere, run it with SUPABASE_BACKEND=fake and GEMINI_BACKEND=fake
+(and the same FAKE_SUPABASE_APPLICATIONS / FAKE_SUPABASE_JOBS / FAKE_STORAGE_PORT) and pass --url.
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from loadtest.fake_supabase import build_fixture
+
+ENDPOINTS = [
+    '/api/resume/download',
+    '/api/job-description/download',
+    '/api/update-match-percentage',
+]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadStats:
+    """Thread-safe per-endpoint latencies, status codes and errors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        self._errors = {endpoint: 0 for endpoint in ENDPOINTS}
+        self._statuses = {endpoint: {} for endpoint in ENDPOINTS}
+        self.flows_completed = 0
+        self.flows_failed = 0
+        self._score_latencies = []
+        self._match_outcomes = {'scored': 0, 'failed': 0, 'timed_out': 0}
+
+    def record(self, endpoint: str, latency: float, ok: bool, status: str):
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+            self._errors[endpoint] += 0 if ok else 1
+            self._statuses[endpoint][status] = self._statuses[endpoint].get(status, 0) + 1
+
+    def record_match(self, outcome: str, latency: float):
+        """Outcome of one match job; latency runs from the enqueueing response to the result."""
+        with self._lock:
+            self._match_outcomes[outcome] += 1
+            if outcome == 'scored':
+                self._score_latencies.append(latency)
+
+    def record_flow(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.flows_completed += 1
+            else:
+                self.flows_failed += 1
+
+    def report(self, elapsed: float) -> Dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint in ENDPOINTS:
+                latencies = sorted(self._latencies[endpoint])
+                count = len(latencies)
+                endpoints[endpoint] = {
+                    'requests': count,
+                    'errors': self._errors[endpoint],
+                    'error_rate': self._errors[endpoint] / count if count else 0.0,
+                    'throughput_rps': count / elapsed if elapsed else 0.0,
+                    'p50_ms': percentile(latencies, 50) * 1000,
+                    'p95_ms': percentile(latencies, 95) * 1000,
+                    'p99_ms': percentile(latencies, 99) * 1000,
+                    'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+                    'statuses': dict(self._statuses[endpoint]),
+                }
+            score_latencies = sorted(self._score_latencies)
+            matches = dict(
+                self._match_outcomes,
+                throughput_per_second=len(score_latencies) / elapsed if elapsed else 0.0,
+                time_to_score_p50_ms=percentile(score_latencies, 50) * 1000,
+                time_to_score_p95_ms=percentile(score_latencies, 95) * 1000,
+                time_to_score_p99_ms=percentile(score_latencies, 99) * 1000,
+                time_to_score_max_ms=(score_latencies[-1] if score_latencies else 0.0) * 1000,
+            )
+            return {
+                'elapsed_seconds': elapsed,
+                'flows_completed': self.flows_completed,
+                'flows_failed': self.flows_failed,
+                'flows_per_second': self.flows_completed / elapsed if elapsed else 0.0,
+                'endpoints': endpoints,
+                'matches': matches,
+            }
+
+
+def build_scenarios() -> List[Dict]:
+    """One apply flow per fixture application, with the fields the frontend sends."""
+    tables = build_fixture()['tables']
+    jobs = {job['id']: job for job in tables['jobs']}
+    candidates = {profile['user_id']: profile for profile in tables['candidate_profiles']}
+    return [
+        {
+            'application_id': application['id'],
+            'job_id': application['job_id'],
+            'resume_url': application['resume_url'],
+            'candidate_name': candidates[application['candidate_id']]['full_name'],
+            'company': jobs[application['job_id']]['company'],
+            'position': jobs[application['job_id']]['position'],
+        }
+        for application in tables['job_applications']
+    ]
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, stats: LoadStats, timeout: float, think_time: float, seed: int,
+                 score_timeout: float = 0, poll_interval: float = 0.25):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.think_time = think_time
+        self.score_timeout = score_timeout
+        self.poll_interval = poll_interval
+        self.session = requests.Session()
+        self.random = random.Random(seed)
+
+    def post(self, endpoint: str, payload: Dict) -> Dict:
+        """POST and record the request; returns the JSON body, or None if the request failed."""
+        started = time.perf_counter()
+        body = None
+        try:
+            response = self.session.post(f"{self.base_url}{endpoint}", json=payload, timeout=self.timeout)
+            status = str(response.status_code)
+            if response.ok:
+                body = response.json()
+        except (requests.RequestException, ValueError) as e:
+            status = type(e).__name__
+        self.stats.record(endpoint, time.perf_counter() - started, body is not None, status)
+        return body
+
+    def wait_for_score(self, application_id: str, job_id: str, enqueued_at: float) -> bool:
+        """Poll the result of a match job until it is scored, fails or score_timeout runs out."""
+        url = f"{self.base_url}/api/match-results/{application_id}"
+        deadline = enqueued_at + self.score_timeout
+        while True:
+            try:
+                status = self.session.get(url, params={'jobId': job_id}, timeout=self.timeout).status_code
+            except requests.RequestException:
+                status = None
+            if status in (200, 500):
+                # 500 is a job that failed on its last attempt
+                self.stats.record_match('scored' if status == 200 else 'failed', time.perf_counter() - enqueued_at)
+                return status == 200
+            if time.perf_counter() >= deadline:
+                self.stats.record_match('timed_out', time.perf_counter() - enqueued_at)
+                return False
+            time.sleep(self.poll_interval)
+
+    def apply(self, scenario: Dict) -> bool:
+        """
+        The JobsList.tsx sequence; like the frontend, a failed step ends the flow.
+        Afterwards waits for the match job queued by the uploads, when score_timeout is set.
+        """
+        steps = [
+            ('/api/resume/download', {
+                'resumeUrl': scenario['resume_url'],
+                'candidateName': scenario['candidate_name'],
+                'jobId': scenario['job_id'],
+                'applicationId': scenario['application_id'],
+            }),
+            ('/api/job-description/download', {
+                'jobId': scenario['job_id'],
+                'companyName': scenario['company'],
+                'position': scenario['position'],
+                'applicationId': scenario['application_id'],
+            }),
+            ('/api/update-match-percentage', {
+                'applicationId': scenario['application_id'],
+                'matchPercentage': round(self.random.uniform(1, 100), 1),
+            }),
+        ]
+        match_job_id = enqueued_at = None
+        for endpoint, payload in steps:
+            body = self.post(endpoint, payload)
+            if body is None:
+                return False
+            if body.get('matchJobId'):
+                match_job_id, enqueued_at = body['matchJobId'], time.perf_counter()
+            if self.think_time:
+                time.sleep(self.think_time)
+
+        # Another user replaying the same application may have completed the pair instead
+        if self.score_timeout and match_job_id:
+            self.wait_for_score(scenario['application_id'], match_job_id, enqueued_at)
+        return True
+
+
+def run_load(base_url: str, concurrency: int, duration: float = None, iterations: int = None,
+             ramp_up: float = 0, think_time: float = 0, timeout: float = 30, score_timeout: float = 120,
+             poll_interval: float = 0.25) -> Dict:
+    scenarios = build_scenarios()
+    stats = LoadStats()
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def next_scenario():
+        with lock:
+            if iterations is not None and issued[0] >= iterations:
+                return None
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            scenario = scenarios[issued[0] % len(scenarios)]
+            issued[0] += 1
+            return scenario
+
+    def user_loop(index: int):
+        if ramp_up:
+            time.sleep(ramp_up * index / concurrency)
+        user = VirtualUser(base_url, stats, timeout, think_time, seed=index,
+                           score_timeout=score_timeout, poll_interval=poll_interval)
+        while True:
+            scenario = next_scenario()
+            if scenario is None:
+                return
+            stats.record_flow(user.apply(scenario))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user_loop, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = stats.report(time.perf_counter() - started)
+    report['concurrency'] = concurrency
+    report['match_queue'] = fetch_json(f"{base_url.rstrip('/')}/api/match-queue/stats")
+    return report
+
+
+def fetch_json(url: str) -> Dict:
+    try:
+        return requests.get(url, timeout=10).json().get('stats')
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def start_local_api(args) -> str:
+    """Start the Flask app in this process against the stand-ins, with state in a scratch directory."""
+    scratch = tempfile.mkdtemp(prefix='resume-matcher-load-')
+    os.environ['SUPABASE_BACKEND'] = 'fake'
+    os.environ['GEMINI_BACKEND'] = 'fake'
+    os.environ.setdefault('BLOB_STORE_PATH', os.path.join(scratch, 'blobs'))
+    os.environ.setdefault('MATCH_QUEUE_PATH', os.path.join(scratch, 'match_queue.sqlite3'))
+    os.environ.setdefault('SCORE_CACHE_PATH', os.path.join(scratch, 'score_cache.sqlite3'))
+
+    settings = {
+        'FAKE_SUPABASE_LATENCY_MS': args.supabase_latency_ms,
+        'FAKE_SUPABASE_ERROR_RATE': args.supabase_error_rate,
+        'FAKE_STORAGE_LATENCY_MS': args.storage_latency_ms,
+        'FAKE_STORAGE_ERROR_RATE': args.storage_error_rate,
+        'FAKE_GEMINI_LATENCY_MS': args.gemini_latency_ms,
+        'FAKE_GEMINI_ERROR_RATE': args.gemini_error_rate,
+        'FAKE_SUPABASE_APPLICATIONS': args.applications,
+    }
+    for name, value in settings.items():
+        if value is not None:
+            os.environ[name] = str(value)
+
+    from werkzeug.serving import make_server
+    import app as api
+
+    # Per-request access logs would swamp the report
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    server = make_server('127.0.0.1', args.port, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='load-test-api', daemon=True).start()
+    print(f"Started API against local stand-ins on port {server.server_port} (state in {scratch})")
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def print_report(report: Dict):
+    print(f"\n=== Load test: {report['concurrency']} users, {report['elapsed_seconds']:.1f}s ===")
+    print(f"Flows completed: {report['flows_completed']}  failed: {report['flows_failed']}  "
+          f"({report['flows_per_second']:.2f} flows/s)\n")
+    print(f"{'endpoint':<32}{'requests':>9}{'rps':>9}{'errors':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:<32}{stats['requests']:>9}{stats['throughput_rps']:>9.2f}{stats['error_rate']:>9.1%}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+    matches = report['matches']
+    print(f"\nMatches scored: {matches['scored']}  failed: {matches['failed']}  timed out: {matches['timed_out']}  "
+          f"({matches['throughput_per_second']:.2f} matches/s)")
+    if matches['scored']:
+        print(f"Time to score: p50 {matches['time_to_score_p50_ms']:.1f} ms  p95 {matches['time_to_score_p95_ms']:.1f} ms  "
+              f"p99 {matches['time_to_score_p99_ms']:.1f} ms")
+    if report.get('match_queue'):
+        print(f"\nMatch queue after run: {report['match_queue']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the candidate apply flow against the API")
+    parser.add_argument('--url', help="API base URL; omit to start the API in-process against the stand-ins")
+    parser.add_argument('--port', type=int, default=0, help="Port for the in-process API (default: any free port)")
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--duration', type=float, help="Seconds to run (default 30 unless --iterations is set)")
+    parser.add_argument('--iterations', type=int, help="Total apply flows to run")
+    parser.add_argument('--ramp-up', type=float, default=0, help="Seconds over which users are started")
+    parser.add_argument('--think-time', type=float, default=0, help="Seconds each user waits between requests")
+    parser.add_argument('--timeout', type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument('--score-timeout', type=float, default=120,
+                        help="Seconds each user waits for its match to be scored; 0 skips waiting")
+    parser.add_argument('--poll-interval', type=float, default=0.25, help="Seconds between match result polls")
+    parser.add_argument('--applications', type=int, help="Fixture applications (FAKE_SUPABASE_APPLICATIONS)")
+    parser.add_argument('--supabase-latency-ms', type=float)
+    parser.add_argument('--supabase-error-rate', type=float)
+    parser.add_argument('--storage-latency-ms', type=float)
+    parser.add_argument('--storage-error-rate', type=float)
+    parser.add_argument('--gemini-latency-ms', type=float)
+    parser.add_argument('--gemini-error-rate', type=float)
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if args.applications is not None:
+        os.environ['FAKE_SUPABASE_APPLICATIONS'] = str(args.applications)
+    duration = args.duration if args.duration or args.iterations else 30
+
+    base_url = args.url or start_local_api(args)
+    report = run_load(
+        base_url, args.concurrency, duration=duration, iterations=args.iterations,
+        ramp_up=args.ramp_up, think_time=args.think_time, timeout=args.timeout,
+        score_timeout=args.score_timeout, poll_interval=args.poll_interval
+    )
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import os
+import time
+import socket
+import threading
+from typing import Dict, List
+from blob_store import BlobStore, create_blob_store
+from work_queue import MAX_ATTEMPTS, MatchQueue, ResultStore, create_match_queue, create_result_store
+from resume_matcher import SCORING_PROMPT_VERSION, ResumeMatcher, parse_json_response
+
+
+class MatchingWorker:
+    """
+    Claims match jobs from the queue, fetches their blobs, runs the matcher and publishes the result.
+    Any number of workers, in any number of processes or hosts, can share one queue and result store.
+    """
+
+    def __init__(self, matcher: ResumeMatcher, queue: MatchQueue, results: ResultStore, blobs: BlobStore,
+                 poll_interval: float = 1.0, lease_seconds: float = 300, maintenance_interval: float = None):
+        self.matcher = matcher
+        self.queue = queue
+        self.results = results
+        self.blobs = blobs
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.maintenance_interval = maintenance_interval if maintenance_interval is not None else float(
+            os.getenv('MATCH_MAINTENANCE_INTERVAL_SECONDS', '300')
+        )
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.active_files = set()  # Scratch files of running matches; the spool sweeper must not remove these
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._maintenance_thread = None
+
+    def is_busy(self, file_path: str) -> bool:
+        with self._lock:
+            return file_path in self.active_files
+
+    def start(self, thread_count: int = None) -> List[threading.Thread]:
+        thread_count = thread_count or int(os.getenv('MATCH_WORKERS', '8'))
+        for index in range(thread_count):
+            thread = threading.Thread(
+                target=self.run, args=(f"{self.worker_id}-{index}",), name=f"resume-match-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        self._maintenance_thread = threading.Thread(
+            target=self.run_maintenance, name="resume-match-maintenance", daemon=True
+        )
+        self._maintenance_thread.start()
+        return self._threads
+
+    def stop(self):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._maintenance_thread is not None:
+            self._maintenance_thread.join()
+            self._maintenance_thread = None
+
+    def run(self, worker_id: str):
+        while not self._stop_event.is_set():
+            try:
+                job = self.queue.claim(worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"Error claiming match job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._stop_event.wait(self.poll_interval)
+                continue
+
+            try:
+                self.process_job(job)
+                self.queue.complete(job['id'])
+            except Exception as e:
+                print(f"Error processing match job {job['id']}: {str(e)}")
+                self.handle_failure(job, str(e))
+
+    def run_maintenance(self):
+        while not self._stop_event.wait(self.maintenance_interval):
+            try:
+                self.maintain()
+            except Exception as e:
+                print(f"Error expiring match queue state: {str(e)}")
+
+    def maintain(self) -> Dict:
+        """Expire abandoned documents and failed jobs, then remove blobs no remaining job refers to."""
+        expired = self.queue.expire()
+        expired['blobs'] = self.blobs.sweep(self.queue.referenced_blobs())
+        return expired
+
+    def handle_failure(self, job: Dict, error: str):
+        """Requeue a failed job; on its last attempt publish the error so waiting callers stop waiting."""
+        try:
+            if job['attempts'] >= MAX_ATTEMPTS:
+                self.results.put(job['application_id'], job['id'], {
+                    "success": False,
+                    "application_id": job['application_id'],
+                    "error": error
+                })
+            self.queue.fail(job['id'], error)
+        except Exception as e:
+            # The lease runs out and the job is claimed again, so losing this update is not fatal
+            print(f"Error recording failure of match job {job['id']}: {str(e)}")
+
+    def materialize(self, spool, blob_key: str, filename: str) -> str:
+        """Write a blob to a local scratch file for the PDF/text extractors."""
+        data = self.blobs.get(blob_key)
+        if data is None:
+            raise ValueError(f"Blob {blob_key} not found")
+        path = spool.path_for(filename)
+        with self._lock:
+            self.active_files.add(path)
+        return spool.write_atomic(filename, data)
+
+    def process_job(self, job: Dict):
+        """Match one application and store its score and result."""
+        application_id = job['application_id']
+        options = job.get('options') or {}
+        scratch_name = f"{application_id}_{job['id'][:8]}"
+        resume_path = jd_path = None
+
+        try:
+            resume_path = self.materialize(self.matcher.resume_spool, job['resume_key'], f"{scratch_name}.pdf")
+            jd_path = self.materialize(self.matcher.jd_spool, job['jd_key'], f"{scratch_name}.txt")
+
+            from db import get_job_application, update_match_percentage
+            application = get_job_application(application_id) or {}
+
+            result = self.matcher.match_resume_to_job(
+                resume_path, jd_path, application.get('candidate_id'), application.get('job_id'),
+                scoring_mode=options.get('mode', 'scores'),
+                deep_analysis=options.get('deep_analysis', False)
+            )
+            if not result['success']:
+                raise RuntimeError(result.get('error', 'Failed to match resume'))
+
+            matching_result = result['matching_result']
+            if not matching_result.get('success'):
+                raise RuntimeError(matching_result.get('error', 'Failed to score resume'))
+
+            scores = parse_json_response(matching_result['data'])
+            match_percentage = float(scores.get("overall_score", 0))
+
+            # Only proceed with update if match percentage is not 0; the raw score lets later calibrations rescale it
+            if match_percentage > 0:
+                update_match_percentage(
+                    application_id, match_percentage,
+                    raw_score=float(scores.get("raw_overall_score", match_percentage)),
+                    model=matching_result['model'], prompt_version=SCORING_PROMPT_VERSION
+                )
+
+            self.results.put(application_id, job['id'], {
+                "success": True,
+                "application_id": application_id,
+                "match_percentage": match_percentage,
+                "result": result
+            })
+
+        finally:
+            for spool, path in ((self.matcher.resume_spool, resume_path), (self.matcher.jd_spool, jd_path)):
+                if path:
+                    spool.remove(path)
+                    with self._lock:
+                        self.active_files.discard(path)
+
+
+def create_worker(matcher: ResumeMatcher = None) -> MatchingWorker:
+    """Worker wired to the configured queue, result store and blob store."""
+    matcher = matcher or ResumeMatcher()
+    worker = MatchingWorker(matcher, create_match_queue(), create_result_store(), create_blob_store())
+    matcher.resume_spool.is_busy = worker.is_busy
+    matcher.jd_spool.is_busy = worker.is_busy
+    return worker
+
+
+# Run matching workers on their own, separately from the API nodes
+if __name__ == "__main__":
+    worker = create_worker()
+    threads = worker.start()
+    print(f"\n=== Matching worker {worker.worker_id} started with {len(threads)} threads ===")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop()
@@ -0,0 +1,232 @@
+import os
+import time
+import threading
+from typing import Dict, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# GEMINI_BACKEND=fake swaps in the local stand-in used for load testing (see loadtest/)
+if os.getenv('GEMINI_BACKEND', 'live') == 'fake':
+    from loadtest import fake_gemini as genai
+else:
+    import google.generativeai as genai
+
+# Configure Gemini API
+genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+
+# Model per tier: flash for bulk work, pro only where the extra quality matters
+DEFAULT_TIERS = {
+    'fast': 'models/gemini-1.5-flash',
+    'quality': 'models/gemini-1.5-pro',
+}
+
+# Tier per pipeline stage
+DEFAULT_POLICIES = {
+    'extraction': 'fast',
+    'scoring': 'fast',
+    'analysis': 'fast',
+    'deep_analysis': 'quality',
+}
+
+# USD per million (input, output) tokens, used for cost accounting only
+DEFAULT_PRICES = {
+    'models/gemini-1.5-flash': (0.075, 0.30),
+    'models/gemini-1.5-pro': (1.25, 5.00),
+}
+
+# Fast-tier scores in this range get re-scored by the quality tier
+DEFAULT_BORDERLINE_RANGE = (40.0, 70.0)
+
+
+def _is_unknown_seed_error(error: Exception) -> bool:
+    """Whether the SDK rejected generation_config because it has no seed field."""
+    message = str(error).lower()
+    return 'seed' in message and any(
+        phrase in message for phrase in ('unknown field', 'unexpected keyword', 'no field', 'has no attribute')
+    )
+
+
+def _cancel_stream(response):
+    """
+    Stop a streamed response now rather than when it is garbage collected: cancels the SDK's underlying
+    gRPC call (a no-op once it has finished), or closes the stream if it is a plain generator.
+    """
+    for target in (response, getattr(response, '_iterator', None)):
+        for method in ('cancel', 'close'):
+            stop = getattr(target, method, None)
+            if callable(stop):
+                try:
+                    stop()
+                except Exception as e:
+                    print(f"Error cancelling Gemini stream: {str(e)}")
+                return
+
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    """Parse 'a=b,c=d' environment settings."""
+    pairs = {}
+    for item in (value or '').split(','):
+        key, sep, val = item.partition('=')
+        if sep and key.strip() and val.strip():
+            pairs[key.strip()] = val.strip()
+    return pairs
+
+
+def _parse_range(value: str, default: Tuple[float, float]) -> Tuple[float, float]:
+    """Parse a 'low,high' environment setting."""
+    try:
+        low, high = (float(part) for part in value.split(','))
+        return low, high
+    except (AttributeError, ValueError):
+        return default
+
+
+class ModelRouter:
+    """
+    Picks a Gemini model per pipeline stage and request, and keeps per-model latency, token and cost totals.
+
+    Configured through the environment:
+    - GEMINI_FAST_MODEL / GEMINI_QUALITY_MODEL: model names for the two tiers
+    - ROUTER_POLICIES: stage=tier overrides, e.g. "scoring=quality,analysis=fast"
+    - ROUTER_BORDERLINE_RANGE: "low,high" fast-tier scores that get escalated, e.g. "40,70"
+    - GEMINI_PRICES: model=input/output USD per million tokens, e.g. "models/gemini-1.5-pro=1.25/5"
+    """
+
+    def __init__(self):
+        self.tiers = {
+            'fast': os.getenv('GEMINI_FAST_MODEL', DEFAULT_TIERS['fast']),
+            'quality': os.getenv('GEMINI_QUALITY_MODEL', DEFAULT_TIERS['quality']),
+        }
+        self.policies = dict(DEFAULT_POLICIES)
+        self.policies.update(_parse_pairs(os.getenv('ROUTER_POLICIES')))
+        self.borderline_range = _parse_range(os.getenv('ROUTER_BORDERLINE_RANGE'), DEFAULT_BORDERLINE_RANGE)
+
+        self.prices = dict(DEFAULT_PRICES)
+        for model_name, price in _parse_pairs(os.getenv('GEMINI_PRICES')).items():
+            try:
+                input_price, output_price = (float(part) for part in price.split('/'))
+                self.prices[model_name] = (input_price, output_price)
+            except ValueError:
+                print(f"Ignoring invalid price for {model_name}: {price}")
+
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        # Whether the installed SDK accepts a seed in generation_config; learned on first use
+        self._seed_supported = None
+
+    def model_name_for(self, stage: str, tier: str = None) -> str:
+        """Model to use for a stage; an explicit tier overrides the stage policy."""
+        tier = tier or self.policies.get(stage, 'fast')
+        return self.tiers.get(tier, self.tiers['fast'])
+
+    def get_model(self, model_name: str):
+        """Reuse one GenerativeModel per model name."""
+        with self._lock:
+            if model_name not in self._models:
+                self._models[model_name] = genai.GenerativeModel(model_name=model_name)
+            return self._models[model_name]
+
+    def should_escalate(self, score: float) -> bool:
+        """Whether a fast-tier score is borderline enough to be worth a quality-tier re-score."""
+        low, high = self.borderline_range
+        return score is not None and low <= score <= high \
+            and self.tiers['quality'] != self.tiers['fast']
+
+    def generate(self, stage: str, prompt: str, tier: str = None, stream: bool = False,
+                 generation_config: Dict = None, seed: int = None, **kwargs):
+        """
+        Call generate_content on the model routed for this stage.
+        A seed is added to generation_config when the SDK supports it and silently dropped otherwise.
+        Streamed responses are wrapped so accounting happens when the caller finishes or stops iterating;
+        callers that stop early must close() the returned generator, which cancels the underlying stream.
+        """
+        model_name = self.model_name_for(stage, tier)
+        model = self.get_model(model_name)
+        started = time.time()
+        try:
+            if seed is not None and self._seed_supported is not False:
+                try:
+                    response = model.generate_content(
+                        prompt, stream=stream, generation_config=dict(generation_config or {}, seed=seed), **kwargs
+                    )
+                    self._seed_supported = True
+                except (TypeError, ValueError, KeyError, AttributeError) as e:
+                    # Only an unknown-field error about the seed means the SDK is too old; anything else is a real failure
+                    if self._seed_supported or not _is_unknown_seed_error(e):
+                        raise
+                    print(f"Gemini SDK does not accept a seed, continuing without one: {str(e)}")
+                    self._seed_supported = False
+                    response = model.generate_content(
+                        prompt, stream=stream, generation_config=generation_config, **kwargs
+                    )
+            else:
+                response = model.generate_content(
+                    prompt, stream=stream, generation_config=generation_config, **kwargs
+                )
+        except Exception:
+            self.record(model_name, stage, time.time() - started, None, failed=True)
+            raise
+
+        if stream:
+            return self._account_stream(model_name, stage, started, response)
+
+        self.record(model_name, stage, time.time() - started, getattr(response, 'usage_metadata', None))
+        return response
+
+    def _account_stream(self, model_name: str, stage: str, started: float, response):
+        usage = None
+        failed = False
+        try:
+            for chunk in response:
+                usage = getattr(chunk, 'usage_metadata', None) or usage
+                yield chunk
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _cancel_stream(response)
+            self.record(model_name, stage, time.time() - started, usage, failed=failed)
+
+    def record(self, model_name: str, stage: str, latency: float, usage, failed: bool = False):
+        """Add one call to the per-model totals."""
+        input_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+        output_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+        input_price, output_price = self.prices.get(model_name, (0.0, 0.0))
+        cost = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+        with self._lock:
+            stats = self._stats.setdefault(model_name, {
+                'calls': 0,
+                'errors': 0,
+                'total_latency': 0.0,
+                'max_latency': 0.0,
+                'input_tokens': 0,
+                'output_tokens': 0,
+                'cost_usd': 0.0,
+                'calls_by_stage': {},
+            })
+            stats['calls'] += 1
+            stats['errors'] += 1 if failed else 0
+            stats['total_latency'] += latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+            stats['input_tokens'] += input_tokens
+            stats['output_tokens'] += output_tokens
+            stats['cost_usd'] += cost
+            stats['calls_by_stage'][stage] = stats['calls_by_stage'].get(stage, 0) + 1
+
+    def get_stats(self) -> Dict:
+        """Snapshot of the per-model totals with average latency."""
+        with self._lock:
+            snapshot = {}
+            for model_name, stats in self._stats.items():
+                snapshot[model_name] = dict(stats, calls_by_stage=dict(stats['calls_by_stage']))
+                snapshot[model_name]['avg_latency'] = stats['total_latency'] / stats['calls'] if stats['calls'] else 0.0
+            return {
+                'tiers': dict(self.tiers),
+                'policies': dict(self.policies),
+                'borderline_range': list(self.borderline_range),
+                'models': snapshot,
+            }
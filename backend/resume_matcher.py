@@ -1,211 +1,86 @@
 import os
-import google.generativeai as genai
-from typing import Dict, List, Tuple
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
 import PyPDF2
 import re
 from dotenv import load_dotenv
-import time
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 import json
-import threading
-import shutil
+from model_router import ModelRouter
+from spool import Spool, SpoolSweeper
+from score_cache import ScoreCache, content_hash
+from resume_parser import build_profile, is_profile_current, extract_job_skills
+from skill_taxonomy import (
+    TAXONOMY_VERSION, normalize_skills, skills_to_vector, vector_to_hex, vector_from_hex,
+    skills_coverage, skills_coverage_many
+)
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-# Swap to flash model to reduce load
-model = genai.GenerativeModel(model_name="models/gemini-1.5-flash")
-
-class ResumeFileHandler(FileSystemEventHandler):
-    def __init__(self, matcher):
-        self.matcher = matcher
-        self.processing_files = set()
-        self.last_processed = {}
-        self.last_event_time = {}  # Track last event time for each file
-        self.processing_lock = threading.Lock()  # Add lock for thread safety
-        self.processing_job_ids = set()  # Track which job IDs are being processed
-
-    def on_created(self, event):
-        if event.is_directory:
-            return
-
-        file_path = event.src_path
-        current_time = time.time()
-        
-        # Check if we've processed this file recently (within 2 seconds)
-        if file_path in self.last_event_time and current_time - self.last_event_time[file_path] < 2:
-            return
-            
-        self.last_event_time[file_path] = current_time
-        
-        if file_path in self.processing_files:
-            return
-
-        # Wait a short time to ensure file is completely written
-        time.sleep(1)
-
-        try:
-            if file_path.endswith('.pdf') and 'temp_resumes' in file_path:
-                self.process_resume(file_path)
-            elif file_path.endswith('.txt') and 'temp_jd' in file_path:
-                self.process_job_description(file_path)
-        except Exception as e:
-            pass
-
-    def process_resume(self, resume_path: str):
-        """Process a new resume file."""
-        self.processing_files.add(resume_path)
-
-        # Wait for corresponding job description
-        job_id = self.extract_job_id_from_filename(resume_path)
-        if not job_id:
-            return
-
-        # Look for matching job description
-        jd_path = self.find_matching_jd(job_id)
-        if jd_path:
-            self.process_matching_files(resume_path, jd_path)
-        else:
-            # Store resume path for later processing
-            self.last_processed[job_id] = {'resume': resume_path}
-
-    def process_job_description(self, jd_path: str):
-        """Process a new job description file."""
-        self.processing_files.add(jd_path)
-
-        # Extract job ID from filename
-        job_id = self.extract_job_id_from_filename(jd_path)
-        if not job_id:
-            return
-
-        # Look for matching resume
-        resume_path = self.find_matching_resume(job_id)
-        if resume_path:
-            self.process_matching_files(resume_path, jd_path)
-        else:
-            # Store job description path for later processing
-            if job_id in self.last_processed:
-                self.last_processed[job_id]['jd'] = jd_path
-            else:
-                self.last_processed[job_id] = {'jd': jd_path}
-
-    def process_matching_files(self, resume_path: str, jd_path: str):
-        """Process matching resume and job description files."""
-        job_id = self.extract_job_id_from_filename(resume_path)
-        
-        # Check if this job ID is already being processed
-        if job_id in self.processing_job_ids:
-            return
-            
-        self.processing_job_ids.add(job_id)
-        
-        with self.processing_lock:  # Use lock to prevent concurrent processing
-            try:
-                # Match resume against job description
-                result = self.matcher.match_resume_to_job(resume_path, jd_path)
-
-                if result['success']:
-                    # Get application ID from database using job_id
-                    try:
-                        from db import get_application_id_by_job_id
-                        application_id = get_application_id_by_job_id(job_id)
-                        
-                        if application_id:
-                            match_result = result['matching_result']
-                            
-                            # Get the data field which contains the JSON string
-                            if isinstance(match_result, dict) and 'data' in match_result:
-                                json_str = match_result['data']
-                                
-                                # Clean up the JSON string (remove ```json and ```)
-                                json_str = json_str.replace('```json', '').replace('```', '').strip()
-                                
-                                try:
-                                    parsed_result = json.loads(json_str)
-                                    match_percentage = float(parsed_result.get("overall_score", 0))
-                                    
-                                    # Only proceed with update if match percentage is not 0
-                                    if match_percentage > 0:
-                                        # Update match percentage in database
-                                        from db import update_match_percentage
-                                        update_match_percentage(application_id, match_percentage)
-                                except json.JSONDecodeError:
-                                    return
-                            else:
-                                return
-                    except Exception:
-                        pass
-                    
-                    # Clean up files after all processing is done
-                    self.cleanup_files(resume_path, jd_path)
-
-            except Exception:
-                pass
-            finally:
-                self.processing_files.remove(resume_path)
-                self.processing_files.remove(jd_path)
-                if job_id in self.last_processed:
-                    del self.last_processed[job_id]
-                self.processing_job_ids.remove(job_id)
-
-    def extract_job_id_from_filename(self, file_path: str) -> str:
-        """Extract job ID from filename."""
-        try:
-            filename = os.path.basename(file_path)
-            # Assuming filename format: something_jobid_uuid.extension
-            parts = filename.split('_')
-            if len(parts) >= 2:
-                return parts[-2]  # Return the job ID part
-        except Exception:
-            pass
-        return None
-
-    def find_matching_jd(self, job_id: str) -> str:
-        """Find matching job description file for a job ID."""
-        if job_id in self.last_processed and 'jd' in self.last_processed[job_id]:
-            return self.last_processed[job_id]['jd']
-        return None
-
-    def find_matching_resume(self, job_id: str) -> str:
-        """Find matching resume file for a job ID."""
-        if job_id in self.last_processed and 'resume' in self.last_processed[job_id]:
-            return self.last_processed[job_id]['resume']
+# Routes each Gemini call to the fast or quality model tier
+router = ModelRouter()
+
+def parse_json_response(text: str) -> Dict:
+    """Parse a JSON object from a Gemini response, tolerating ```json fences."""
+    cleaned = text.replace('```json', '').replace('```', '').strip()
+    return json.loads(cleaned)
+
+# Bump whenever build_scoring_prompt changes so cached scores from the old prompt are not reused
+SCORING_PROMPT_VERSION = 2
+
+# Scoring is sampled greedily so the same resume/JD pair gets the same score
+SCORING_GENERATION_CONFIG = {
+    'temperature': float(os.getenv('SCORING_TEMPERATURE', '0')),
+    'top_k': 1,
+    'candidate_count': 1,
+}
+SCORING_SEED = int(os.getenv('SCORING_SEED')) if os.getenv('SCORING_SEED') else None
+
+SCORE_KEYS = ('overall_score', 'experience_match', 'education_match')
+_SCORE_PATTERNS = {
+    # The number only counts once a delimiter follows it; "8." or "8" at the end of a chunk may still grow
+    key: re.compile(rf'"{key}"\s*:\s*"?(-?\d+(?:\.\d+)?)(?=\s*"?\s*[,}}\n])')
+    for key in SCORE_KEYS
+}
+
+def extract_streamed_scores(partial_text: str) -> Dict:
+    """Read the numeric scores from a possibly incomplete JSON response, or None until all have arrived."""
+    scores = {}
+    for key, pattern in _SCORE_PATTERNS.items():
+        match = pattern.search(partial_text)
+        if not match:
+            return None
+        scores[key] = float(match.group(1))
+    return scores
+
+def overall_score(matching_result: Dict) -> float:
+    """Overall score from a calculate_matching_score result, or None if it cannot be read."""
+    try:
+        return float(parse_json_response(matching_result['data']).get('overall_score'))
+    except (KeyError, TypeError, ValueError, AttributeError):
         return None
 
-    def cleanup_files(self, resume_path: str, jd_path: str):
-        """Clean up processed files."""
-        try:
-            if os.path.exists(resume_path):
-                os.remove(resume_path)
-            if os.path.exists(jd_path):
-                os.remove(jd_path)
-        except Exception:
-            pass
-
 class ResumeMatcher:
     def __init__(self):
         self.temp_resume_dir = os.path.join(os.path.dirname(__file__), 'temp_resumes')
         self.temp_jd_dir = os.path.join(os.path.dirname(__file__), 'temp_jd')
         
-        # Create directories if they don't exist
-        os.makedirs(self.temp_resume_dir, exist_ok=True)
-        os.makedirs(self.temp_jd_dir, exist_ok=True)
-        
-        # Initialize file watcher
-        self.event_handler = ResumeFileHandler(self)
-        self.observer = Observer()
-        self.observer.schedule(self.event_handler, self.temp_resume_dir, recursive=False)
-        self.observer.schedule(self.event_handler, self.temp_jd_dir, recursive=False)
-        self.observer.start()
+        # Required-skill bitsets per job ID, so each job is vectorized once per process
+        self.job_skill_vectors = {}
+
+        # Persistent memo of scores per resume profile, JD, model and prompt version
+        self.score_cache = ScoreCache()
+
+        # Scratch spools for resumes and job descriptions being matched; creates the directories if they don't exist
+        self.resume_spool = Spool(self.temp_resume_dir)
+        self.jd_spool = Spool(self.temp_jd_dir)
+        self.sweeper = SpoolSweeper([self.resume_spool, self.jd_spool])
+        self.sweeper.start()
 
     def __del__(self):
         """Cleanup when the object is destroyed."""
-        if hasattr(self, 'observer'):
-            self.observer.stop()
-            self.observer.join()
+        if hasattr(self, 'sweeper'):
+            self.sweeper.stop()
 
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text content from PDF file."""
@@ -227,30 +102,79 @@ class ResumeMatcher:
         except Exception:
             return ""
 
-    def extract_resume_content(self, resume_path: str) -> Dict:
-        """Extract structured content from resume using Gemini."""
+    def extract_resume_content(self, resume_path: str, candidate_id: str = None) -> Dict:
+        """
+        Build a compact candidate profile from a resume.
+        The profile is parsed locally, stored per candidate and reused until the resume or parser changes;
+        Gemini is only asked for the sections the local parser could not find.
+        """
         try:
             # Extract raw text from PDF
             raw_text = self.extract_text_from_pdf(resume_path)
-            
-            # Use Gemini to extract structured information
+
+            if candidate_id:
+                from db import get_candidate_resume_profile
+                stored_profile = get_candidate_resume_profile(candidate_id)
+                if is_profile_current(stored_profile, raw_text):
+                    return stored_profile
+
+            profile = build_profile(raw_text)
+            if profile['missing']:
+                profile = self.fill_profile_gaps(raw_text, profile)
+
+            if candidate_id:
+                from db import save_candidate_resume_profile
+                save_candidate_resume_profile(candidate_id, profile)
+
+            return profile
+        except Exception:
+            return {}
+
+    def fill_profile_gaps(self, raw_text: str, profile: Dict) -> Dict:
+        """Use Gemini to fill only the profile sections the local parser left empty."""
+        try:
+            missing = profile['missing']
             prompt = f"""
-            Extract the following information from this resume:
-            1. Skills (list all technical and soft skills)
-            2. Experience (years of experience and key roles)
-            3. Education
-            4. Key achievements
+            Extract only the following sections from this resume: {', '.join(missing)}
+            - skills: list of technical and soft skills
+            - experience: list of key roles, one short line each
+            - education: list of degrees, one short line each
+            - achievements: list of key achievements, one short line each
             
             Resume text:
             {raw_text}
             
-            Format the response as a JSON with these keys: skills, experience, education, achievements
+            Format the response as a JSON object with exactly these keys: {', '.join(missing)}
+            Each value must be a list of strings.
             """
-            
-            response = model.generate_content(prompt)
-            return response.text
+
+            response = router.generate('extraction', prompt)
+            extracted = parse_json_response(response.text)
+
+            for key in missing:
+                values = extracted.get(key) or []
+                if isinstance(values, str):
+                    values = [values]
+                if key == 'skills':
+                    normalized = normalize_skills(values)
+                    profile['skills'] = normalized['known'] + normalized['unknown']
+                else:
+                    profile[key] = [str(value) for value in values]
+
+            profile['source'] = 'local+llm'
+            profile['missing'] = [key for key in missing if not profile[key]]
+            return profile
         except Exception:
-            return {}
+            return profile
+
+    def profile_for_prompt(self, resume_content) -> str:
+        """Render a candidate profile for an LLM prompt without its bookkeeping fields."""
+        if not isinstance(resume_content, dict):
+            return str(resume_content)
+        hidden = ('version', 'taxonomy_version', 'resume_hash', 'source', 'missing')
+        return json.dumps(
+            {key: value for key, value in resume_content.items() if key not in hidden}, indent=2, sort_keys=True
+        )
 
     def extract_job_requirements(self, jd_path: str) -> Dict:
         """Extract structured content from job description using Gemini."""
@@ -272,37 +196,207 @@ class ResumeMatcher:
             Format the response as a JSON with these keys: required_skills, required_experience, required_education, responsibilities
             """
             
-            response = model.generate_content(prompt)
+            response = router.generate('extraction', prompt)
             return response.text
         except Exception:
             return {}
 
-    def calculate_matching_score(self, resume_content: Dict, job_requirements: Dict) -> Tuple[float, Dict]:
-        """Calculate matching score between resume and job requirements."""
-        try:
-            # Use Gemini to analyze match
-            prompt = f"""
+    def get_job_skill_vector(self, job_id: str = None, jd_text: str = None) -> int:
+        """
+        Required-skill bitset for a job.
+        Looked up in memory, then in the jobs table, and only derived from the job text when neither has it.
+        """
+        if job_id and job_id in self.job_skill_vectors:
+            return self.job_skill_vectors[job_id]
+
+        if not job_id:
+            return skills_to_vector(extract_job_skills(jd_text or ""))
+
+        from db import get_job_skill_vector
+        stored = get_job_skill_vector(job_id)
+        if stored and stored.get('skill_taxonomy_version') == TAXONOMY_VERSION and stored.get('required_skill_vector'):
+            vector = vector_from_hex(stored['required_skill_vector'])
+        else:
+            vector = self.precompute_job_skills(job_id, jd_text)
+
+        self.job_skill_vectors[job_id] = vector
+        return vector
+
+    def precompute_job_skills(self, job_id: str, jd_text: str = None) -> int:
+        """Extract a job's required skills, store them with their bitset and return the bitset."""
+        if jd_text is None:
+            from db import get_job_description
+            job_data = get_job_description(job_id) or {}
+            jd_text = f"{job_data.get('description') or ''}\n{job_data.get('requirements') or ''}"
+
+        required_skills = extract_job_skills(jd_text)
+        vector = skills_to_vector(required_skills)
+
+        from db import save_job_skill_vector
+        save_job_skill_vector(job_id, required_skills, vector_to_hex(vector), TAXONOMY_VERSION)
+
+        self.job_skill_vectors[job_id] = vector
+        return vector
+
+    def calculate_skills_match(self, resume_content: Dict, job_id: str = None, jd_text: str = None) -> Optional[Dict]:
+        """
+        Deterministic skills match between a candidate profile and a job's required skills,
+        or None when the job has no recognised required skills.
+        """
+        skills = resume_content.get('skills', []) if isinstance(resume_content, dict) else []
+        return skills_coverage(self.get_job_skill_vector(job_id, jd_text), skills_to_vector(skills))
+
+    def calculate_job_skills_matches(self, job_id: str) -> List[Dict]:
+        """Skills match for every applicant of a job in one pass, best first."""
+        from db import get_job_application_candidates, get_candidate_resume_profiles
+        applications = get_job_application_candidates(job_id)
+        profiles = get_candidate_resume_profiles({app['candidate_id'] for app in applications})
+
+        candidate_vectors = {
+            app['id']: skills_to_vector(profiles.get(app['candidate_id'], {}).get('skills', []))
+            for app in applications
+        }
+        scores = skills_coverage_many(self.get_job_skill_vector(job_id), candidate_vectors)
+
+        return sorted(
+            [
+                {
+                    "application_id": app['id'],
+                    "candidate_id": app['candidate_id'],
+                    "skills_match": scores[app['id']],
+                    "has_profile": app['candidate_id'] in profiles
+                }
+                for app in applications
+            ],
+            # Jobs without recognised skills give every applicant None; keep their order stable
+            key=lambda item: item['skills_match'] if item['skills_match'] is not None else -1,
+            reverse=True
+        )
+
+    def build_scoring_prompt(self, resume_content: Dict, job_requirements: Dict, skills_match: Dict = None) -> str:
+        """Prompt for match scoring; the score keys come first so they can be read off a stream."""
+        skills_context = ""
+        if skills_match is not None:
+            skills_context = f"""
+            Skills coverage (precomputed, use as given):
+            {skills_match['score']}% of required skills present
+            Matched: {', '.join(skills_match['matched']) or 'none'}
+            Missing: {', '.join(skills_match['missing']) or 'none'}
+            """
+
+        return f"""
             Analyze the match between this resume and job requirements.
             Calculate a matching score (0-100) and provide detailed analysis.
             
             Resume content:
-            {resume_content}
+            {self.profile_for_prompt(resume_content)}
             
             Job requirements:
             {job_requirements}
-            
-            Format the response as a JSON with these keys:
+            {skills_context}
+            Format the response as a JSON object with these keys, in exactly this order:
             - overall_score (number 0-100)
-            - skills_match (percentage of required skills present)
-            - experience_match (how well experience matches requirements)
-            - education_match (how well education matches requirements)
+            - experience_match (number 0-100, how well experience matches requirements)
+            - education_match (number 0-100, how well education matches requirements)
             - detailed_analysis (text explaining the match)
             """
+
+    def calculate_matching_score(self, resume_content: Dict, job_requirements: Dict, skills_match: Dict = None,
+                                 mode: str = 'full', tier: str = None) -> Tuple[float, Dict]:
+        """
+        Calculate matching score between resume and job requirements.
+        The response is streamed; in 'scores' mode generation is cancelled as soon as all scores
+        have arrived and the detailed analysis is left for generate_detailed_analysis to produce on demand.
+        """
+        try:
+            # Use Gemini to analyze match
+            prompt = self.build_scoring_prompt(resume_content, job_requirements, skills_match)
+
+            response = router.generate(
+                'scoring', prompt, tier=tier, stream=True,
+                generation_config=SCORING_GENERATION_CONFIG, seed=SCORING_SEED
+            )
+            data = ""
+            scores = None
+            # Closing the stream on the way out cancels generation at once instead of whenever it is collected
+            with closing(response):
+                for chunk in response:
+                    data += chunk.text
+                    if scores is None:
+                        scores = extract_streamed_scores(data)
+                        if scores is not None:
+                            if skills_match is not None:
+                                scores['skills_match'] = skills_match['score']
+                            if mode == 'scores':
+                                # Stop consuming the stream; the analysis is not needed
+                                break
+
+            if mode == 'scores':
+                if scores is None:
+                    return {
+                        "success": False,
+                        "error": "Scores not found in model response"
+                    }
+                return {
+                    "success": True,
+                    "data": json.dumps(scores),
+                    "skills_match": skills_match,
+                    "analysis_deferred": True,
+                    "model": router.model_name_for('scoring', tier)
+                }
+
+            # Report the deterministic skills match instead of anything the model says about skills
+            if skills_match is not None:
+                try:
+                    parsed = parse_json_response(data)
+                    parsed['skills_match'] = skills_match['score']
+                    data = json.dumps(parsed)
+                except (json.JSONDecodeError, AttributeError):
+                    pass
+
+            return {
+                "success": True,
+                "data": data,
+                "skills_match": skills_match,
+                "model": router.model_name_for('scoring', tier)
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def generate_detailed_analysis(self, resume_content: Dict, job_requirements: Dict, scores: Dict = None,
+                                   deep: bool = False) -> Dict:
+        """
+        Produce the written match analysis on its own, for results scored in 'scores' mode.
+        deep=True routes to the quality model for recruiter-requested analysis.
+        """
+        try:
+            scores_context = ""
+            if scores:
+                scores_context = f"""
+            Scores already assigned (explain them, do not change them):
+            {json.dumps(scores)}
+            """
+
+            prompt = f"""
+            Explain how well this resume matches the job requirements.
+            
+            Resume content:
+            {self.profile_for_prompt(resume_content)}
             
-            response = model.generate_content(prompt)
+            Job requirements:
+            {job_requirements}
+            {scores_context}
+            Respond with plain text only.
+            """
+
+            response = router.generate('deep_analysis' if deep else 'analysis', prompt)
             return {
                 "success": True,
-                "data": response.text
+                "detailed_analysis": response.text
             }
 
         except Exception as e:
@@ -311,15 +405,47 @@ class ResumeMatcher:
                 "error": str(e)
             }
 
-    def match_resume_to_job(self, resume_path: str, jd_path: str) -> Dict:
-        """Main function to match a resume against a job description."""
+    def match_resume_to_job(self, resume_path: str, jd_path: str, candidate_id: str = None, job_id: str = None,
+                            scoring_mode: str = 'full', deep_analysis: bool = False) -> Dict:
+        """
+        Main function to match a resume against a job description.
+        Scoring runs on the fast model; borderline scores, or deep_analysis requests, use the quality model.
+        """
         try:
-            # Extract content from both files
-            resume_content = self.extract_resume_content(resume_path)
-            job_requirements = self.extract_job_requirements(jd_path)
+            # Extract content from both files; the JD is only sent to Gemini if no cached score exists
+            resume_content = self.extract_resume_content(resume_path, candidate_id)
+            jd_text = self.extract_text_from_txt(jd_path)
+            skills_match = self.calculate_skills_match(resume_content, job_id, jd_text)
+            cache_key = (content_hash(self.profile_for_prompt(resume_content)), content_hash(jd_text))
+            job_requirements = None
+
+            def score(tier: str = None) -> Dict:
+                nonlocal job_requirements
+                cached_result = self.get_cached_score(cache_key, tier, scoring_mode)
+                if cached_result is not None:
+                    return cached_result
+
+                if job_requirements is None:
+                    job_requirements = self.extract_job_requirements(jd_path)
+                result = self.calculate_matching_score(
+                    resume_content, job_requirements, skills_match, mode=scoring_mode, tier=tier
+                )
+                if result['success']:
+                    self.store_score(cache_key, tier, result)
+                return result
 
             # Calculate matching score
-            matching_result = self.calculate_matching_score(resume_content, job_requirements)
+            matching_result = score('quality' if deep_analysis else None)
+
+            if not deep_analysis and matching_result['success'] \
+                    and router.should_escalate(overall_score(matching_result)):
+                escalated_result = score('quality')
+                if escalated_result['success']:
+                    escalated_result['escalated_from'] = matching_result['model']
+                    matching_result = escalated_result
+
+            if matching_result['success']:
+                matching_result = self.apply_calibration(matching_result)
 
             return {
                 "success": True,
@@ -334,11 +460,34 @@ class ResumeMatcher:
                 "error": str(e)
             }
 
-# Example usage
-if __name__ == "__main__":
-    matcher = ResumeMatcher()
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        pass
+    def get_cached_score(self, cache_key: Tuple[str, str], tier: str, scoring_mode: str) -> Dict:
+        """Cached scoring result for this pair and model; 'full' mode needs a result that includes the analysis."""
+        model_name = router.model_name_for('scoring', tier)
+        cached_result = self.score_cache.get(*cache_key, model_name, SCORING_PROMPT_VERSION)
+        if cached_result is None:
+            return None
+        if scoring_mode == 'full' and cached_result.get('analysis_deferred'):
+            return None
+        return dict(cached_result, cached=True)
+
+    def store_score(self, cache_key: Tuple[str, str], tier: str, result: Dict):
+        """Memoize a raw (uncalibrated) scoring result."""
+        existing = self.score_cache.get(*cache_key, result['model'], SCORING_PROMPT_VERSION)
+        # Never replace a full result with a scores-only one
+        if existing is not None and not existing.get('analysis_deferred') and result.get('analysis_deferred'):
+            return
+        self.score_cache.put(
+            *cache_key, result['model'], SCORING_PROMPT_VERSION, result, raw_overall_score=overall_score(result)
+        )
+
+    def apply_calibration(self, matching_result: Dict) -> Dict:
+        """Replace overall_score with its calibrated value, keeping the model's score as raw_overall_score."""
+        raw_score = overall_score(matching_result)
+        calibrated_score = self.score_cache.calibrate(raw_score, matching_result['model'], SCORING_PROMPT_VERSION)
+        if raw_score is None or calibrated_score == raw_score:
+            return matching_result
+
+        parsed = parse_json_response(matching_result['data'])
+        parsed['raw_overall_score'] = raw_score
+        parsed['overall_score'] = calibrated_score
+        return dict(matching_result, data=json.dumps(parsed), calibrated=True)
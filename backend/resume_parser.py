@@ -0,0 +1,224 @@
+import re
+import hashlib
+from datetime import date
+from typing import Dict, List, Tuple
+from skill_taxonomy import TAXONOMY_VERSION, extract_skills
+
+# Bump whenever the profile layout or parsing rules change so stored profiles get rebuilt
+PROFILE_VERSION = 2
+
+# Section name -> headings that introduce it (compared after lowercasing and stripping punctuation)
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "about me", "objective", "career objective"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "technologies", "tools", "tools and technologies", "skill set", "skillset", "expertise",
+               "required skills", "skills required", "preferred skills", "must have", "nice to have"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "employment", "internships", "internship", "career history"],
+    "education": ["education", "academic background", "academics", "educational qualifications",
+                  "qualifications", "academic qualifications"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects"],
+    "achievements": ["achievements", "accomplishments", "awards", "honors", "honours",
+                     "awards and achievements", "certifications", "certificates"],
+}
+
+_HEADING_TO_SECTION = {
+    heading: section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+# Limits that keep the stored profile compact
+MAX_SECTION_LINES = 12
+MAX_LINE_LENGTH = 200
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+_MONTH_NAME = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE_POINT = rf"(?:{_MONTH_NAME}\s*,?\s*\d{{4}}|\d{{1,2}}\s*[/.-]\s*\d{{4}}|\d{{4}})"
+_DATE_END = rf"(?:{_DATE_POINT}|present|current|now|till date|to date|ongoing)"
+_DATE_RANGE_PATTERN = re.compile(
+    rf"({_DATE_POINT})\s*(?:-|–|—|to|until|till)\s*({_DATE_END})",
+    re.IGNORECASE
+)
+
+
+def resume_hash(raw_text: str) -> str:
+    """Stable hash of the resume text, used to detect when a stored profile is stale."""
+    normalized = " ".join(raw_text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _split_heading(line: str) -> Tuple[str, str]:
+    """
+    Return (section, inline content) for a heading line such as "Skills" or "Skills: Python, SQL",
+    or (None, None) if the line is not a heading.
+    """
+    section = _match_heading(line)
+    if section:
+        return section, ""
+
+    head, sep, rest = line.partition(":")
+    if sep:
+        section = _match_heading(head)
+        if section:
+            return section, rest.strip()
+    return None, None
+
+
+def _match_heading(line: str) -> str:
+    """Return the section a line introduces, or None if it is not a heading."""
+    candidate = line.strip().strip(":-•*#|").strip().lower()
+    if not candidate or len(candidate.split()) > 5:
+        return None
+    candidate = re.sub(r"[^a-z& ]", "", candidate).replace("&", "and")
+    candidate = " ".join(candidate.split())
+    return _HEADING_TO_SECTION.get(candidate)
+
+
+def segment_sections(raw_text: str) -> Dict[str, List[str]]:
+    """Split resume text into sections keyed by section name; text before any heading goes to 'header'."""
+    sections = {"header": []}
+    current = "header"
+
+    for line in raw_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        section, inline = _split_heading(stripped)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            # Headings like "Skills: Python, SQL" carry content on the same line
+            if inline:
+                sections[current].append(inline)
+            continue
+
+        sections[current].append(stripped)
+
+    return {name: lines for name, lines in sections.items() if lines}
+
+
+def _parse_date_point(text: str, is_end: bool = False) -> Tuple[int, int]:
+    """Parse a single date into (year, month); bare years start in January and end in December."""
+    text = text.strip().lower()
+    if text in ("present", "current", "now", "till date", "to date", "ongoing"):
+        today = date.today()
+        return today.year, today.month
+
+    year_match = re.search(r"\d{4}", text)
+    if not year_match:
+        return None
+    year = int(year_match.group())
+
+    month_match = re.match(r"([a-z]+)", text)
+    if month_match and month_match.group(1)[:3] in _MONTHS:
+        return year, _MONTHS[month_match.group(1)[:3]]
+
+    numeric_month = re.match(r"(\d{1,2})\s*[/.-]", text)
+    if numeric_month and 1 <= int(numeric_month.group(1)) <= 12:
+        return year, int(numeric_month.group(1))
+
+    return year, 12 if is_end else 1
+
+
+def parse_date_ranges(lines: List[str]) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Find all date ranges like 'Jan 2019 - Present' or '2016 - 2020' in the given lines."""
+    ranges = []
+    for line in lines:
+        for match in _DATE_RANGE_PATTERN.finditer(line):
+            start = _parse_date_point(match.group(1))
+            end = _parse_date_point(match.group(2), is_end=True)
+            if start and end and start <= end:
+                ranges.append((start, end))
+    return ranges
+
+
+def years_of_experience(lines: List[str]) -> float:
+    """Total years covered by the date ranges in the lines, counting overlapping roles once."""
+    intervals = sorted(
+        (start[0] * 12 + start[1] - 1, end[0] * 12 + end[1])
+        for start, end in parse_date_ranges(lines)
+    )
+
+    total_months = 0
+    current_start, current_end = None, None
+    for start, end in intervals:
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total_months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total_months += current_end - current_start
+
+    return round(total_months / 12, 1)
+
+
+def _compact(lines: List[str]) -> List[str]:
+    """Trim a section to a bounded number of reasonably short lines."""
+    compacted = []
+    for line in lines[:MAX_SECTION_LINES]:
+        line = line.lstrip("-•*· ").strip()
+        if line:
+            compacted.append(line[:MAX_LINE_LENGTH])
+    return compacted
+
+
+def build_profile(raw_text: str) -> Dict:
+    """
+    Build a compact candidate profile from resume text without calling the LLM.
+    Sections the rules could not find are listed in 'missing' so callers can fill just those gaps.
+    """
+    sections = segment_sections(raw_text)
+
+    skills = extract_skills("\n".join(sections.get("skills", [])), lenient=True)
+    for name in ("experience", "projects", "summary", "header"):
+        for skill in extract_skills("\n".join(sections.get(name, []))):
+            if skill not in skills:
+                skills.append(skill)
+
+    experience_lines = sections.get("experience", [])
+    profile = {
+        "version": PROFILE_VERSION,
+        "taxonomy_version": TAXONOMY_VERSION,
+        "resume_hash": resume_hash(raw_text),
+        "skills": skills,
+        "experience_years": years_of_experience(experience_lines),
+        "experience": _compact(experience_lines),
+        "education": _compact(sections.get("education", [])),
+        "achievements": _compact(sections.get("achievements", [])),
+        "source": "local",
+    }
+    profile["missing"] = [
+        key for key in ("skills", "experience", "education", "achievements")
+        if not profile[key]
+    ]
+    return profile
+
+
+def is_profile_current(profile: Dict, raw_text: str) -> bool:
+    """Check that a stored profile was built from this resume by the current parser and taxonomy."""
+    return bool(profile) \
+        and profile.get("version") == PROFILE_VERSION \
+        and profile.get("taxonomy_version") == TAXONOMY_VERSION \
+        and profile.get("resume_hash") == resume_hash(raw_text)
+
+
+def extract_job_skills(description: str, requirements: str = "") -> List[str]:
+    """Canonical skills a job asks for, trusting short aliases only inside its skills sections."""
+    sections = segment_sections(f"{description or ''}\n{requirements or ''}")
+
+    skills = extract_skills("\n".join(sections.get("skills", [])), lenient=True)
+    for name, lines in sections.items():
+        if name == "skills":
+            continue
+        for skill in extract_skills("\n".join(lines)):
+            if skill not in skills:
+                skills.append(skill)
+    return skills
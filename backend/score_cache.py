@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import bisect
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List
+
+# Quantiles stored per calibration; raw scores are mapped onto their percentile among past results
+CALIBRATION_QUANTILES = list(range(0, 101, 5))
+MIN_CALIBRATION_SAMPLES = 30
+
+# How often running processes check for calibrations fitted by `python score_cache.py calibrate`
+CALIBRATION_RELOAD_SECONDS = float(os.getenv('CALIBRATION_RELOAD_SECONDS', '60'))
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), 'score_cache.sqlite3')
+
+
+def content_hash(value) -> str:
+    """Stable SHA-256 of a string, or of a JSON-serialisable value with sorted keys."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True)
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def _interpolate(x: float, xs: List[float], ys: List[float]) -> float:
+    """Piecewise-linear interpolation through (xs, ys), clamped at both ends."""
+    if x <= xs[0]:
+        return ys[0]
+    if x >= xs[-1]:
+        return ys[-1]
+    i = bisect.bisect_right(xs, x)
+    x0, x1, y0, y1 = xs[i - 1], xs[i], ys[i - 1], ys[i]
+    if x1 == x0:
+        return y1
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+
+class ScoreCache:
+    """
+    Persistent memo of match scores keyed by (resume profile hash, JD hash, model, prompt version),
+    plus per model/prompt-version calibrations fitted offline from the stored raw scores.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('SCORE_CACHE_PATH', DEFAULT_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS scores (
+                resume_hash TEXT NOT NULL,
+                jd_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                raw_overall_score REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (resume_hash, jd_hash, model, prompt_version)
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS calibrations (
+                model TEXT NOT NULL,
+                prompt_version INTEGER NOT NULL,
+                raw_knots TEXT NOT NULL,
+                calibrated_knots TEXT NOT NULL,
+                sample_count INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, prompt_version)
+            )
+        ''')
+        self._conn.commit()
+        self._calibrations = self._load_calibrations()
+        self._calibrations_version = self._calibration_version()
+        self._calibrations_checked_at = time.time()
+
+    def get(self, resume_hash: str, jd_hash: str, model: str, prompt_version: int) -> Dict:
+        """Cached scoring result, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result FROM scores WHERE resume_hash = ? AND jd_hash = ? AND model = ? AND prompt_version = ?',
+                (resume_hash, jd_hash, model, prompt_version)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, resume_hash: str, jd_hash: str, model: str, prompt_version: int, result: Dict,
+            raw_overall_score: float = None):
+        """Store (or replace) a scoring result."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (resume_hash, jd_hash, model, prompt_version, json.dumps(result), raw_overall_score, time.time())
+            )
+            self._conn.commit()
+
+    def _calibration_version(self):
+        """Changes whenever a calibration is added or refitted, in this or any other process."""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*), MAX(created_at) FROM calibrations').fetchone()
+
+    def _refresh_calibrations(self):
+        """Pick up calibrations fitted elsewhere, checking at most every CALIBRATION_RELOAD_SECONDS."""
+        now = time.time()
+        if now - self._calibrations_checked_at < CALIBRATION_RELOAD_SECONDS:
+            return
+        self._calibrations_checked_at = now
+        version = self._calibration_version()
+        if version != self._calibrations_version:
+            self._calibrations = self._load_calibrations()
+            self._calibrations_version = version
+
+    def _load_calibrations(self) -> Dict:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT model, prompt_version, raw_knots, calibrated_knots FROM calibrations'
+            ).fetchall()
+        return {
+            (model, prompt_version): (json.loads(raw_knots), json.loads(calibrated_knots))
+            for model, prompt_version, raw_knots, calibrated_knots in rows
+        }
+
+    def calibrate(self, raw_score: float, model: str, prompt_version: int) -> float:
+        """Map a raw score onto the calibrated scale, or return it unchanged if no calibration is fitted."""
+        self._refresh_calibrations()
+        calibration = self._calibrations.get((model, prompt_version))
+        if raw_score is None or calibration is None:
+            return raw_score
+        return round(_interpolate(raw_score, *calibration), 1)
+
+    def fit_calibrations(self, min_samples: int = MIN_CALIBRATION_SAMPLES) -> Dict:
+        """
+        Fit a quantile calibration per model and prompt version from the stored raw scores;
+        returns the sample count per fitted (model, prompt version).
+        A calibrated score is the percentile of the raw score among historical results for the same model
+        and prompt, so scores from different models and prompt versions land on a comparable 0-100 scale.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT model, prompt_version, raw_overall_score FROM scores WHERE raw_overall_score IS NOT NULL'
+            ).fetchall()
+
+        samples = {}
+        for model, prompt_version, score in rows:
+            samples.setdefault((model, prompt_version), []).append(score)
+
+        fitted = {}
+        for (model, prompt_version), scores in samples.items():
+            if len(scores) < min_samples:
+                continue
+            scores.sort()
+            raw_knots = []
+            calibrated_knots = []
+            for q in CALIBRATION_QUANTILES:
+                raw = scores[min(len(scores) - 1, int(round(q / 100 * (len(scores) - 1))))]
+                # Repeated raw values collapse to the highest percentile they reach
+                if raw_knots and raw == raw_knots[-1]:
+                    calibrated_knots[-1] = float(q)
+                    continue
+                raw_knots.append(raw)
+                calibrated_knots.append(float(q))
+
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO calibrations VALUES (?, ?, ?, ?, ?, ?)',
+                    (model, prompt_version, json.dumps(raw_knots), json.dumps(calibrated_knots), len(scores), time.time())
+                )
+                self._conn.commit()
+            fitted[(model, prompt_version)] = len(scores)
+
+        self._calibrations = self._load_calibrations()
+        self._calibrations_version = self._calibration_version()
+        return fitted
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM scores').fetchone()[0]
+        return {
+            'entries': entries,
+            'calibrations': [f"{model}@v{version}" for model, version in self._calibrations],
+        }
+
+
+# Offline calibration: python score_cache.py calibrate [min_samples]
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'calibrate':
+        print("Usage: python score_cache.py calibrate [min_samples]")
+        sys.exit(1)
+
+    min_samples = int(sys.argv[2]) if len(sys.argv) > 2 else MIN_CALIBRATION_SAMPLES
+    cache = ScoreCache()
+    fitted = cache.fit_calibrations(min_samples)
+    if not fitted:
+        print(f"No model/prompt version has at least {min_samples} stored scores")
+
+    # Stored match percentages follow the previous fit; move them onto the new scale so rankings stay comparable
+    from db import rescale_match_percentages
+    for (model, prompt_version), count in fitted.items():
+        print(f"Fitted calibration for {model}@v{prompt_version} from {count} scores")
+        updated = rescale_match_percentages(
+            model, prompt_version, lambda raw_score: cache.calibrate(raw_score, model, prompt_version)
+        )
+        print(f"Rescaled {updated} stored match percentages for {model}@v{prompt_version}")
@@ -0,0 +1,234 @@
+import re
+from typing import Dict, List, Optional
+
+# Bump whenever SKILL_TAXONOMY or the skill extraction rules change so stored profiles and job skill vectors get rebuilt
+TAXONOMY_VERSION = 3
+
+# Canonical skill name -> known synonyms/spellings (matched case-insensitively)
+SKILL_TAXONOMY = {
+    # Programming languages
+    "Python": ["python", "python3", "py"],
+    "Java": ["java", "core java", "java se", "java ee", "j2ee"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6", "es2015"],
+    "TypeScript": ["typescript", "ts"],
+    "C": ["c", "c language", "ansi c"],
+    "C++": ["c++", "cpp", "cplusplus"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Go": ["go", "golang"],
+    "Rust": ["rust"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "R": ["r", "r programming"],
+    "Scala": ["scala"],
+    "SQL": ["sql", "t-sql", "pl/sql", "plsql"],
+    "Bash": ["bash", "shell scripting", "shell script", "sh"],
+    # Web
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "scss", "sass"],
+    "React": ["react", "reactjs", "react.js"],
+    "React Native": ["react native", "react-native"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue": ["vue", "vuejs", "vue.js"],
+    "Node.js": ["node", "nodejs", "node.js"],
+    "Express": ["express", "expressjs", "express.js"],
+    "Next.js": ["next.js", "nextjs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring Boot": ["spring boot", "springboot", "spring"],
+    ".NET": [".net", "dotnet", "asp.net", ".net core"],
+    "REST APIs": ["rest", "rest api", "rest apis", "restful", "restful apis"],
+    "GraphQL": ["graphql"],
+    "Tailwind CSS": ["tailwind", "tailwind css", "tailwindcss"],
+    # Data and ML
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "TensorFlow": ["tensorflow", "tf"],
+    "PyTorch": ["pytorch", "torch"],
+    "Keras": ["keras"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning", "dl"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision", "cv"],
+    "MLflow": ["mlflow"],
+    "DVC": ["dvc"],
+    "MLOps": ["mlops", "ml ops"],
+    "Feature Engineering": ["feature engineering"],
+    "Data Preprocessing": ["data preprocessing", "data pre-processing"],
+    "Data Cleaning": ["data cleaning", "data wrangling", "data cleansing"],
+    "Statistical Analysis": ["statistical analysis", "statistics", "statistical modeling"],
+    "Excel": ["excel", "ms excel", "microsoft excel", "advanced excel"],
+    "Power BI": ["power bi", "powerbi"],
+    "Tableau": ["tableau"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "Hadoop": ["hadoop"],
+    # Databases
+    "PostgreSQL": ["postgresql", "postgres", "psql"],
+    "MySQL": ["mysql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Supabase": ["supabase"],
+    "Firebase": ["firebase"],
+    # Cloud and DevOps
+    "AWS": ["aws", "amazon web services"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Azure": ["azure", "microsoft azure"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Jenkins": ["jenkins"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "Git": ["git"],
+    "GitHub": ["github"],
+    "GitHub Actions": ["github actions"],
+    "CI/CD": ["ci/cd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Prometheus": ["prometheus"],
+    "Grafana": ["grafana"],
+    "Linux": ["linux", "unix"],
+    # Project management and tools
+    "Agile": ["agile", "agile methodology"],
+    "Scrum": ["scrum"],
+    "JIRA": ["jira"],
+    "MS Project": ["ms project", "microsoft project"],
+    "MS Office": ["ms office", "microsoft office", "ms office suite"],
+    # HR
+    "Recruitment": ["recruitment", "recruiting", "recruitment & selection", "talent acquisition"],
+    "Employee Engagement": ["employee engagement"],
+    "Performance Management": ["performance management"],
+    "Payroll": ["payroll", "payroll & compliance"],
+    # Soft skills
+    "Communication": ["communication", "communication skills"],
+    "Team Leadership": ["team leadership", "leadership", "team lead"],
+    "Time Management": ["time management"],
+    "Problem Solving": ["problem solving", "problem-solving"],
+    "Teamwork": ["teamwork", "team player", "collaboration"],
+}
+
+# Short or common-word aliases that only count when they appear in a skills section
+# (elsewhere "excel at", "spark interest" or a colleague called Jenkins are not skills; "MS Excel" still is)
+AMBIGUOUS_ALIASES = {
+    "c", "r", "go", "py", "ts", "tf", "sh", "ml", "dl", "cv", "rest", "node", "spring", "swift", "rust", "express",
+    "torch", "excel", "spark", "ruby", "jenkins", "sass",
+}
+
+# Alias -> canonical name
+_ALIAS_TO_CANONICAL = {}
+for _canonical, _aliases in SKILL_TAXONOMY.items():
+    _ALIAS_TO_CANONICAL[_canonical.lower()] = _canonical
+    for _alias in _aliases:
+        _ALIAS_TO_CANONICAL[_alias.lower()] = _canonical
+
+
+def _build_pattern(aliases: List[str]):
+    """Compile one alternation over the aliases, longest first so 'react native' wins over 'react'."""
+    alternation = "|".join(re.escape(alias) for alias in sorted(aliases, key=len, reverse=True))
+    return re.compile(r"(?<![\w+#.])(" + alternation + r")(?![\w+#])", re.IGNORECASE)
+
+
+_STRICT_PATTERN = _build_pattern([a for a in _ALIAS_TO_CANONICAL if a not in AMBIGUOUS_ALIASES])
+_LENIENT_PATTERN = _build_pattern(list(_ALIAS_TO_CANONICAL))
+
+
+def normalize_skill(name: str) -> str:
+    """Map a skill name or synonym to its canonical name, or None if unknown."""
+    if not name:
+        return None
+    return _ALIAS_TO_CANONICAL.get(name.strip().lower())
+
+
+def extract_skills(text: str, lenient: bool = False) -> List[str]:
+    """
+    Find known skills in free text and return their canonical names in order of first appearance.
+    Use lenient=True for text from a skills section, where short aliases like 'Go' or 'R' are trusted.
+    """
+    if not text:
+        return []
+
+    pattern = _LENIENT_PATTERN if lenient else _STRICT_PATTERN
+    skills = []
+    seen = set()
+    for match in pattern.finditer(text):
+        canonical = _ALIAS_TO_CANONICAL[match.group(1).lower()]
+        if canonical not in seen:
+            seen.add(canonical)
+            skills.append(canonical)
+    return skills
+
+
+def normalize_skills(names: List[str]) -> Dict[str, List[str]]:
+    """Split a list of raw skill names into canonical known skills and unrecognised leftovers."""
+    known = []
+    unknown = []
+    for name in names or []:
+        canonical = normalize_skill(name)
+        if canonical:
+            if canonical not in known:
+                known.append(canonical)
+        elif name and name.strip() and name.strip() not in unknown:
+            unknown.append(name.strip())
+    return {"known": known, "unknown": unknown}
+
+
+# Canonical name -> stable bit position; new skills must be appended to keep IDs stable within a version
+SKILL_IDS = {canonical: skill_id for skill_id, canonical in enumerate(SKILL_TAXONOMY)}
+_SKILLS_BY_ID = list(SKILL_TAXONOMY)
+
+
+def _popcount(vector: int) -> int:
+    return bin(vector).count("1")
+
+
+def skills_to_vector(skills: List[str]) -> int:
+    """Encode skill names (canonical or synonyms) as a bitset; unknown skills are ignored."""
+    vector = 0
+    for name in skills or []:
+        canonical = normalize_skill(name)
+        if canonical:
+            vector |= 1 << SKILL_IDS[canonical]
+    return vector
+
+
+def vector_to_skills(vector: int) -> List[str]:
+    """Decode a bitset back into canonical skill names."""
+    return [name for skill_id, name in enumerate(_SKILLS_BY_ID) if vector >> skill_id & 1]
+
+
+def vector_to_hex(vector: int) -> str:
+    """Serialize a skill bitset for storage."""
+    return format(vector, "x")
+
+
+def vector_from_hex(value: str) -> int:
+    """Deserialize a stored skill bitset."""
+    return int(value, 16) if value else 0
+
+
+def skills_coverage(required_vector: int, candidate_vector: int) -> Optional[Dict]:
+    """
+    Deterministic skills match: share of the required skills the candidate has.
+    None when the job lists no recognised skills, since there is nothing to cover.
+    """
+    required_count = _popcount(required_vector)
+    if not required_count:
+        return None
+    matched = required_vector & candidate_vector
+    score = round(100.0 * _popcount(matched) / required_count, 1)
+    return {
+        "score": score,
+        "matched": vector_to_skills(matched),
+        "missing": vector_to_skills(required_vector & ~candidate_vector),
+    }
+
+
+def skills_coverage_many(required_vector: int, candidate_vectors: Dict[str, int]) -> Dict[str, Optional[float]]:
+    """Skills match scores for many candidates against one job, keyed like candidate_vectors; None if not applicable."""
+    required_count = _popcount(required_vector)
+    if not required_count:
+        return {key: None for key in candidate_vectors}
+    return {
+        key: round(100.0 * _popcount(required_vector & vector) / required_count, 1)
+        for key, vector in candidate_vectors.items()
+    }
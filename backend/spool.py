@@ -0,0 +1,229 @@
+import os
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+# Suffix of in-progress writes; readers and the file watcher ignore these
+PARTIAL_SUFFIX = '.part'
+
+# Partial files older than this are leftovers from crashed writers
+PARTIAL_GRACE_SECONDS = 300
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def is_partial_file(path: str) -> bool:
+    """Whether a path is an in-progress spool write (or any other hidden file)."""
+    name = os.path.basename(path)
+    return name.startswith('.') or name.endswith(PARTIAL_SUFFIX)
+
+
+class Spool:
+    """
+    A directory of short-lived files with age, size and count quotas.
+
+    Files are written to a hidden partial file and renamed into place, so readers never see half-written files.
+    sweep() removes expired files and then evicts the oldest files until the directory is back under quota.
+    Files for which is_busy(path) is true are never removed; on_evict(path) is called for every removed file.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = None, max_files: int = None, max_age: float = None,
+                 is_busy: Callable[[str], bool] = None, on_evict: Callable[[str], None] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes if max_bytes is not None else _env_number('SPOOL_MAX_BYTES', 512 * 1024 * 1024)
+        self.max_files = max_files if max_files is not None else _env_number('SPOOL_MAX_FILES', 10000)
+        self.max_age = max_age if max_age is not None else _env_number('SPOOL_MAX_AGE_SECONDS', 3600, float)
+        self.is_busy = is_busy
+        self.on_evict = on_evict
+
+        self._lock = threading.Lock()
+        self._counters = {
+            'written': 0,
+            'removed_expired': 0,
+            'removed_over_quota': 0,
+            'removed_partial': 0,
+            'sweeps': 0,
+        }
+        self._last_sweep_at = None
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path_for(self, filename: str) -> str:
+        return os.path.join(self.directory, os.path.basename(filename))
+
+    @contextmanager
+    def open_atomic(self, filename: str, mode: str = 'wb', encoding: str = None):
+        """Open a file for writing that only appears under its final name once closed successfully."""
+        final_path = self.path_for(filename)
+        partial_path = os.path.join(self.directory, f".{os.path.basename(filename)}.{uuid.uuid4().hex[:8]}{PARTIAL_SUFFIX}")
+        try:
+            with open(partial_path, mode, encoding=encoding) as f:
+                yield f
+            os.replace(partial_path, final_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        with self._lock:
+            self._counters['written'] += 1
+
+    def write_atomic(self, filename: str, data, encoding: str = None) -> str:
+        """Write bytes (or text, when encoding is given) to the spool and return the final path."""
+        mode = 'w' if encoding else 'wb'
+        with self.open_atomic(filename, mode, encoding=encoding) as f:
+            f.write(data)
+        return self.path_for(filename)
+
+    def touch(self, path: str):
+        """Mark a file as recently used so quota eviction removes it last."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def _scan(self) -> List[os.DirEntry]:
+        try:
+            with os.scandir(self.directory) as entries:
+                return [entry for entry in entries if entry.is_file(follow_symlinks=False)]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self, path: str, counter: str) -> bool:
+        if not self.remove(path):
+            return False
+        with self._lock:
+            self._counters[counter] += 1
+        if self.on_evict:
+            try:
+                self.on_evict(path)
+            except Exception as e:
+                print(f"Error in spool eviction callback for {path}: {str(e)}")
+        return True
+
+    def sweep(self) -> Dict:
+        """Remove stale partial writes and expired files, then enforce the size and count quotas."""
+        now = time.time()
+        files = []
+
+        for entry in self._scan():
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+
+            age = now - stat.st_mtime
+            if is_partial_file(entry.path):
+                if age > PARTIAL_GRACE_SECONDS:
+                    self._evict(entry.path, 'removed_partial')
+                continue
+
+            busy = bool(self.is_busy and self.is_busy(entry.path))
+            if not busy and self.max_age and age > self.max_age:
+                self._evict(entry.path, 'removed_expired')
+                continue
+
+            files.append((stat.st_mtime, stat.st_size, entry.path, busy))
+
+        total_bytes = sum(size for _, size, _, _ in files)
+        total_files = len(files)
+        for _, size, path, busy in sorted(files):
+            if total_bytes <= self.max_bytes and total_files <= self.max_files:
+                break
+            if busy:
+                continue
+            if self._evict(path, 'removed_over_quota'):
+                total_bytes -= size
+                total_files -= 1
+
+        with self._lock:
+            self._counters['sweeps'] += 1
+            self._last_sweep_at = now
+
+        return self.stats()
+
+    def stats(self) -> Dict:
+        """Current size of the spool plus lifetime write and removal counters."""
+        now = time.time()
+        file_count = 0
+        total_bytes = 0
+        partial_count = 0
+        oldest_mtime = None
+
+        for entry in self._scan():
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if is_partial_file(entry.path):
+                partial_count += 1
+                continue
+            file_count += 1
+            total_bytes += stat.st_size
+            oldest_mtime = stat.st_mtime if oldest_mtime is None else min(oldest_mtime, stat.st_mtime)
+
+        with self._lock:
+            counters = dict(self._counters)
+            last_sweep_at = self._last_sweep_at
+
+        return dict(
+            counters,
+            directory=self.directory,
+            files=file_count,
+            bytes=total_bytes,
+            partial_files=partial_count,
+            oldest_age_seconds=now - oldest_mtime if oldest_mtime is not None else 0,
+            max_bytes=self.max_bytes,
+            max_files=self.max_files,
+            max_age_seconds=self.max_age,
+            last_sweep_at=last_sweep_at
+        )
+
+
+class SpoolSweeper:
+    """Background thread that sweeps a set of spools on a fixed interval."""
+
+    def __init__(self, spools: List[Spool] = None, interval: float = None):
+        self.spools = list(spools or [])
+        self.interval = interval if interval is not None else _env_number('SPOOL_SWEEP_INTERVAL_SECONDS', 60, float)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add(self, spool: Spool):
+        self.spools.append(spool)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='spool-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            for spool in list(self.spools):
+                try:
+                    spool.sweep()
+                except Exception as e:
+                    print(f"Error sweeping spool {spool.directory}: {str(e)}")
+
+    def stats(self) -> Dict:
+        return {os.path.basename(spool.directory): spool.stats() for spool in self.spools}
@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    scratch = tmp_path_factory.mktemp('app')
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv('MATCH_WORKERS_INPROCESS', 'false')
+        monkeypatch.setenv('BLOB_STORE_PATH', str(scratch / 'blobs'))
+        monkeypatch.setenv('MATCH_QUEUE_PATH', str(scratch / 'match_queue.sqlite3'))
+        monkeypatch.setenv('SCORE_CACHE_PATH', str(scratch / 'score_cache.sqlite3'))
+        import app
+        yield app.app.test_client()
+
+
+@pytest.fixture(scope='module')
+def job_id():
+    import db
+    return db.supabase.tables['jobs'][0]['id']
+
+
+@pytest.mark.parametrize('query', [
+    'minScore=abc',
+    'maxScore=nan',
+    'appliedAfter=yesterday',
+    'appliedBefore=2024-13-01',
+    'cursor=zzz',
+])
+def test_ranked_applications_reject_malformed_parameters(client, job_id, query):
+    response = client.get(f'/api/jobs/{job_id}/applications?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+def test_ranked_applications_accept_valid_parameters(client, job_id):
+    response = client.get(f'/api/jobs/{job_id}/applications?minScore=0&appliedBefore=2024-06-02T00:00:00Z&limit=5')
+    assert response.status_code == 200
+    assert len(response.get_json()['applications']) == 5
+    assert response.get_json()['nextCursor']
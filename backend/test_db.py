@@ -0,0 +1,109 @@
+import pytest
+import db
+from loadtest.faults import FaultInjector, InjectedError
+from loadtest.fake_supabase import FakeQuery, FakeSupabase, build_fixture
+
+JOB_APPLICATIONS = 2500
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    client = FakeSupabase(build_fixture(applications=JOB_APPLICATIONS, jobs=1))
+    monkeypatch.setattr(db, 'supabase', client)
+    return client
+
+
+def test_job_application_candidates_page_past_the_row_cap(fake_supabase):
+    job_id = fake_supabase.tables['jobs'][0]['id']
+    applications = db.get_job_application_candidates(job_id)
+
+    assert len(applications) == JOB_APPLICATIONS
+    assert len({application['id'] for application in applications}) == JOB_APPLICATIONS
+
+
+def test_candidate_profiles_are_fetched_in_chunks(fake_supabase, monkeypatch):
+    for profile in fake_supabase.tables['candidate_profiles']:
+        profile['parsed_profile'] = {'skills': ['Python']}
+    candidate_ids = [profile['user_id'] for profile in fake_supabase.tables['candidate_profiles']]
+
+    chunk_sizes = []
+    original_in = FakeQuery.in_
+
+    def recording_in(query, column, values):
+        chunk_sizes.append(len(values))
+        return original_in(query, column, values)
+
+    monkeypatch.setattr(FakeQuery, 'in_', recording_in)
+
+    profiles = db.get_candidate_resume_profiles(candidate_ids)
+    assert len(profiles) == JOB_APPLICATIONS
+    assert max(chunk_sizes) == db.IN_FILTER_CHUNK_SIZE
+
+
+def test_failed_lookups_raise(fake_supabase):
+    fake_supabase.faults = FaultInjector('supabase', error_rate=1)
+    with pytest.raises(InjectedError):
+        db.get_job_application_candidates(fake_supabase.tables['jobs'][0]['id'])
+    with pytest.raises(InjectedError):
+        db.get_candidate_resume_profiles(['candidate'])
+
+
+def test_rescale_moves_stored_scores_onto_the_new_calibration(fake_supabase):
+    applications = fake_supabase.tables['job_applications']
+    db.update_match_percentage(applications[0]['id'], 40.0, raw_score=60.0, model='fast', prompt_version=2)
+    db.update_match_percentage(applications[1]['id'], 75.0, raw_score=60.0, model='fast', prompt_version=2)
+    db.update_match_percentage(applications[2]['id'], 50.0, raw_score=80.0, model='fast', prompt_version=1)
+    db.update_match_percentage(applications[3]['id'], 90.0)
+
+    assert db.rescale_match_percentages('fast', 2, lambda raw_score: raw_score / 2) == 2
+
+    assert [application['match_percentage'] for application in applications[:4]] == [30.0, 30.0, 50.0, 90.0]
+
+
+def test_ranked_applications_page_through_tied_scores_once_in_order(fake_supabase):
+    job_id = fake_supabase.tables['jobs'][0]['id']
+    applications = fake_supabase.tables['job_applications'][:40]
+    fake_supabase.tables['job_applications'] = applications
+    for index, application in enumerate(applications):
+        application['match_percentage'] = float(index % 4 * 10)
+
+    seen = []
+    cursor = None
+    while True:
+        page = db.get_ranked_applications(job_id, limit=7, cursor=cursor)
+        seen.extend(page['applications'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    expected = sorted(applications, key=lambda row: (row['match_percentage'], row['id']), reverse=True)
+    assert [row['id'] for row in seen] == [row['id'] for row in expected]
+
+
+def test_ranked_applications_filter_by_score_and_date(fake_supabase):
+    job_id = fake_supabase.tables['jobs'][0]['id']
+    for index, application in enumerate(fake_supabase.tables['job_applications']):
+        application['match_percentage'] = float(index % 100)
+
+    page = db.get_ranked_applications(job_id, limit=100, min_score=20, max_score=30,
+                                      applied_after='2024-05-31T12:00:00Z')
+    assert page['applications']
+    assert all(20 <= row['match_percentage'] <= 30 for row in page['applications'])
+    assert all(row['applied_at'] >= '2024-05-31T12:00:00' for row in page['applications'])
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    db._encode_cursor(50, 'x),id.gt.(0'),
+    db._encode_cursor(float('nan'), '00000000-0000-0000-0000-000000000000'),
+    db._encode_cursor(True, '00000000-0000-0000-0000-000000000000'),
+    db._encode_cursor('50', '00000000-0000-0000-0000-000000000000'),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        db._decode_cursor(cursor)
+
+
+def test_malformed_timestamps_are_rejected(fake_supabase):
+    with pytest.raises(ValueError):
+        db.get_ranked_applications(fake_supabase.tables['jobs'][0]['id'], applied_before='yesterday')
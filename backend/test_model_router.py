@@ -0,0 +1,40 @@
+from model_router import ModelRouter
+
+
+class StreamingCall:
+    """A streamed response whose underlying call records whether it was cancelled."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.chunks)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class StreamingModel:
+    def __init__(self, call: StreamingCall):
+        self.call = call
+
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        return self.call
+
+
+def test_closing_a_stream_early_cancels_the_call_and_records_it(monkeypatch):
+    router = ModelRouter()
+    call = StreamingCall(['{"overall_score": 80,', ' "experience_match": 70}'])
+    monkeypatch.setattr(router, 'get_model', lambda model_name: StreamingModel(call))
+
+    stream = router.generate('scoring', 'prompt', stream=True)
+    assert next(stream) == '{"overall_score": 80,'
+    assert not call.cancelled
+
+    stream.close()
+    assert call.cancelled
+    assert router.get_stats()['models'][router.model_name_for('scoring')]['calls'] == 1
@@ -0,0 +1,27 @@
+from resume_parser import build_profile, extract_job_skills, segment_sections
+
+
+def test_inline_headings_keep_their_content():
+    sections = segment_sections("Jane Doe\nSkills: Python, Go, R\nExperience: Acme Jan 2019 - Dec 2020")
+    assert sections["skills"] == ["Python, Go, R"]
+    assert sections["experience"] == ["Acme Jan 2019 - Dec 2020"]
+
+
+def test_inline_headings_feed_the_profile():
+    profile = build_profile("Jane Doe\nSkills: Python, Go, R\nExperience: Acme Jan 2019 - Dec 2020")
+    assert profile["skills"] == ["Python", "Go", "R"]
+    assert profile["experience_years"] == 2.0
+
+
+def test_job_skills_from_inline_required_skills_heading():
+    skills = extract_job_skills("We are hiring a backend engineer.", "Required Skills: Go, C, R, Python")
+    assert skills == ["Go", "C", "R", "Python"]
+
+
+def test_everyday_words_are_not_skills_outside_a_skills_section():
+    profile = build_profile("Jane Doe\nSummary\nI excel at communication and spark ideas in Python teams.\n"
+                            "Skills\nExcel, Spark")
+    assert profile["skills"] == ["Excel", "Spark", "Communication", "Python"]
+
+    profile = build_profile("Jane Doe\nSummary\nI excel at communication and built reports in Microsoft Excel.")
+    assert profile["skills"] == ["Communication", "Excel"]
@@ -0,0 +1,125 @@
+import os
+import time
+import pytest
+from blob_store import LocalBlobStore
+from work_queue import (
+    MAX_ATTEMPTS, InProcessMatchQueue, InProcessResultStore, SQLiteMatchQueue, SQLiteResultStore
+)
+
+RESUME_KEY = 'a' * 64
+JD_KEY = 'b' * 64
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def queue(request, tmp_path):
+    if request.param == 'memory':
+        return InProcessMatchQueue()
+    return SQLiteMatchQueue(str(tmp_path / 'queue.sqlite3'))
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def results(request, tmp_path):
+    if request.param == 'memory':
+        return InProcessResultStore()
+    return SQLiteResultStore(str(tmp_path / 'queue.sqlite3'))
+
+
+def test_register_document_enqueues_once_both_documents_are_in(queue):
+    assert queue.register_document('app-1', 'resume', RESUME_KEY, {'mode': 'scores'}) is None
+    assert queue.stats() == {'pending_documents': 1}
+
+    job_id = queue.register_document('app-1', 'jd', JD_KEY)
+    assert job_id is not None
+    assert queue.stats() == {'queued': 1, 'pending_documents': 0}
+
+    job = queue.claim('worker-1')
+    assert (job['id'], job['resume_key'], job['jd_key']) == (job_id, RESUME_KEY, JD_KEY)
+    assert job['options'] == {'mode': 'scores'}
+
+
+def test_register_document_rejects_unknown_kinds(queue):
+    with pytest.raises(ValueError):
+        queue.register_document('app-1', 'cover_letter', RESUME_KEY)
+
+
+def test_claim_hands_out_each_job_once_in_order(queue):
+    first = queue.enqueue('app-1', RESUME_KEY, JD_KEY)
+    second = queue.enqueue('app-2', RESUME_KEY, JD_KEY)
+
+    assert queue.claim('worker-1')['id'] == first
+    assert queue.claim('worker-2')['id'] == second
+    assert queue.claim('worker-3') is None
+
+    queue.complete(first)
+    assert queue.stats() == {'running': 1, 'pending_documents': 0}
+
+
+def test_expired_lease_is_claimed_again(queue):
+    job_id = queue.enqueue('app-1', RESUME_KEY, JD_KEY)
+    assert queue.claim('worker-1', lease_seconds=-1)['attempts'] == 1
+
+    job = queue.claim('worker-2')
+    assert job['id'] == job_id
+    assert job['attempts'] == 2
+    assert queue.claim('worker-3') is None
+
+
+def test_fail_requeues_until_max_attempts(queue):
+    job_id = queue.enqueue('app-1', RESUME_KEY, JD_KEY)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        job = queue.claim('worker-1')
+        assert (job['id'], job['attempts']) == (job_id, attempt)
+        queue.fail(job_id, 'boom')
+
+    assert queue.claim('worker-1') is None
+    assert queue.stats() == {'failed': 1, 'pending_documents': 0}
+
+
+def test_expire_drops_abandoned_documents_and_failed_jobs(queue):
+    queue.register_document('app-1', 'resume', RESUME_KEY)
+    job_id = queue.enqueue('app-2', RESUME_KEY, JD_KEY)
+    for _ in range(MAX_ATTEMPTS):
+        queue.claim('worker-1')
+        queue.fail(job_id, 'boom')
+    queue.enqueue('app-3', RESUME_KEY, JD_KEY)
+
+    assert queue.expire(pending_ttl=3600, failed_ttl=3600) == {'pending_documents': 0, 'failed': 0}
+    assert queue.expire(pending_ttl=-1, failed_ttl=-1) == {'pending_documents': 1, 'failed': 1}
+    assert queue.stats() == {'queued': 1, 'pending_documents': 0}
+
+
+def test_referenced_blobs_ignore_failed_jobs(queue):
+    other_key = 'c' * 64
+    queue.register_document('app-1', 'resume', other_key)
+    job_id = queue.enqueue('app-2', RESUME_KEY, JD_KEY)
+    assert queue.referenced_blobs() == {RESUME_KEY, JD_KEY, other_key}
+
+    for _ in range(MAX_ATTEMPTS):
+        queue.claim('worker-1')
+        queue.fail(job_id, 'boom')
+    assert queue.referenced_blobs() == {other_key}
+
+
+def test_results_are_read_per_job(results):
+    results.put('app-1', 'job-1', {'success': True, 'match_percentage': 40})
+    results.put('app-1', 'job-2', {'success': False, 'error': 'boom'})
+
+    assert results.get_job('job-1')['match_percentage'] == 40
+    assert results.get('app-1')['job_id'] == 'job-2'
+    assert results.wait('job-2', timeout=0)['error'] == 'boom'
+    assert results.wait('job-3', timeout=0) is None
+
+
+def test_blob_sweep_keeps_referenced_and_recent_blobs(tmp_path):
+    blobs = LocalBlobStore(str(tmp_path / 'blobs'))
+    kept = blobs.put(b'resume')
+    recent = blobs.put(b'job description')
+    stale = blobs.put(b'old resume')
+
+    old = time.time() - 7200
+    for key in (kept, stale):
+        os.utime(os.path.join(blobs.root, key[:2], key), (old, old))
+
+    assert blobs.sweep({kept}, max_age=3600) == 1
+    assert blobs.exists(kept) and blobs.exists(recent)
+    assert not blobs.exists(stale)
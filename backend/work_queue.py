@@ -0,0 +1,593 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import importlib
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, Set
+
+# Attempts before a match job is marked failed
+MAX_ATTEMPTS = 3
+
+# How long per-job results, and jobs that failed for good, are kept
+RESULT_TTL_SECONDS = int(os.getenv('MATCH_RESULT_TTL_SECONDS', 24 * 3600))
+
+# How long a registered document waits for the other document of its application
+PENDING_DOCUMENT_TTL_SECONDS = int(os.getenv('PENDING_DOCUMENT_TTL_SECONDS', 3600))
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), 'match_queue.sqlite3')
+
+
+class MatchQueue(ABC):
+    """
+    Queue of match jobs shared by API nodes and matching workers.
+
+    API nodes register each uploaded document for an application; once both the resume and the
+    job description are registered a job is enqueued. Workers claim jobs under a lease, so a job
+    held by a worker that dies is handed out again when the lease expires.
+    """
+
+    @abstractmethod
+    def register_document(self, application_id: str, kind: str, blob_key: str, options: Dict = None) -> str:
+        """Record the 'resume' or 'jd' blob of an application; returns the job ID once both are present."""
+
+    @abstractmethod
+    def enqueue(self, application_id: str, resume_key: str, jd_key: str, options: Dict = None) -> str:
+        """Queue a match job and return its ID."""
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float = 300) -> Dict:
+        """Take the oldest available job, or return None if there is none."""
+
+    @abstractmethod
+    def complete(self, job_id: str):
+        """Remove a finished job from the queue."""
+
+    @abstractmethod
+    def fail(self, job_id: str, error: str):
+        """Put a job back on the queue, or mark it failed after MAX_ATTEMPTS."""
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """Job counts by status, plus applications still waiting for a document."""
+
+    @abstractmethod
+    def expire(self, pending_ttl: float = PENDING_DOCUMENT_TTL_SECONDS, failed_ttl: float = RESULT_TTL_SECONDS) -> Dict:
+        """Drop documents whose partner never arrived and jobs that failed for good; returns the counts removed."""
+
+    @abstractmethod
+    def referenced_blobs(self) -> Set[str]:
+        """Blob keys still needed by waiting documents and by queued or running jobs."""
+
+
+class ResultStore(ABC):
+    """
+    Match results per job, readable from any node. Several jobs can run for one application
+    (the automatic scores-only match and explicit requests), so callers wait on their own job ID.
+    """
+
+    @abstractmethod
+    def put(self, application_id: str, job_id: str, result: Dict):
+        """Store the result of a finished job."""
+
+    @abstractmethod
+    def get(self, application_id: str) -> Dict:
+        """Most recent result for an application."""
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Dict:
+        """Result of one job, or None until it has finished."""
+
+    def wait(self, job_id: str, timeout: float, poll_interval: float = 0.5) -> Dict:
+        """
+        Poll for the result of a job for up to timeout seconds.
+        A job that failed on its last attempt has a result too, with success False and the error.
+        """
+        deadline = time.time() + timeout
+        while True:
+            result = self.get_job(job_id)
+            if result is not None:
+                return result
+            if time.time() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+
+class InProcessMatchQueue(MatchQueue):
+    """Queue held in memory; only usable when API and workers share one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._jobs = {}
+
+    def register_document(self, application_id: str, kind: str, blob_key: str, options: Dict = None) -> str:
+        with self._lock:
+            if kind not in ('resume', 'jd'):
+                raise ValueError(f"Unknown document kind: {kind}")
+            pending = self._pending.setdefault(application_id, {})
+            pending[kind] = blob_key
+            pending['updated_at'] = time.time()
+            if options:
+                pending['options'] = options
+            if 'resume' not in pending or 'jd' not in pending:
+                return None
+            del self._pending[application_id]
+        return self.enqueue(application_id, pending['resume'], pending['jd'], pending.get('options'))
+
+    def enqueue(self, application_id: str, resume_key: str, jd_key: str, options: Dict = None) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                'id': job_id,
+                'application_id': application_id,
+                'resume_key': resume_key,
+                'jd_key': jd_key,
+                'options': options or {},
+                'status': 'queued',
+                'attempts': 0,
+                'lease_expires_at': 0,
+                'created_at': time.time(),
+            }
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: float = 300) -> Dict:
+        now = time.time()
+        with self._lock:
+            available = [
+                job for job in self._jobs.values()
+                if job['status'] == 'queued' or (job['status'] == 'running' and job['lease_expires_at'] < now)
+            ]
+            if not available:
+                return None
+            job = min(available, key=lambda item: item['created_at'])
+            job.update(status='running', worker_id=worker_id, lease_expires_at=now + lease_seconds)
+            job['attempts'] += 1
+            return dict(job)
+
+    def complete(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def fail(self, job_id: str, error: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['error'] = error
+            job['status'] = 'queued' if job['attempts'] < MAX_ATTEMPTS else 'failed'
+            job['updated_at'] = time.time()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return dict(counts, pending_documents=len(self._pending))
+
+    def expire(self, pending_ttl: float = PENDING_DOCUMENT_TTL_SECONDS, failed_ttl: float = RESULT_TTL_SECONDS) -> Dict:
+        now = time.time()
+        with self._lock:
+            pending = [key for key, value in self._pending.items() if value['updated_at'] < now - pending_ttl]
+            for key in pending:
+                del self._pending[key]
+            failed = [
+                key for key, job in self._jobs.items()
+                if job['status'] == 'failed' and job['updated_at'] < now - failed_ttl
+            ]
+            for key in failed:
+                del self._jobs[key]
+        return {'pending_documents': len(pending), 'failed': len(failed)}
+
+    def referenced_blobs(self) -> Set[str]:
+        with self._lock:
+            keys = {key for pending in self._pending.values() for key in (pending.get('resume'), pending.get('jd'))}
+            for job in self._jobs.values():
+                if job['status'] != 'failed':
+                    keys.update((job['resume_key'], job['jd_key']))
+        keys.discard(None)
+        return keys
+
+
+class InProcessResultStore(ResultStore):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+        self._latest = {}
+
+    def put(self, application_id: str, job_id: str, result: Dict):
+        now = time.time()
+        with self._lock:
+            self._results[job_id] = dict(result, job_id=job_id, completed_at=now)
+            self._latest[application_id] = job_id
+            expired = [key for key, value in self._results.items() if value['completed_at'] < now - RESULT_TTL_SECONDS]
+            for key in expired:
+                del self._results[key]
+
+    def get(self, application_id: str) -> Dict:
+        with self._lock:
+            result = self._results.get(self._latest.get(application_id))
+            return dict(result) if result else None
+
+    def get_job(self, job_id: str) -> Dict:
+        with self._lock:
+            result = self._results.get(job_id)
+            return dict(result) if result else None
+
+
+class _SQLiteStore:
+    """Shared SQLite connection; the file can be used by several processes on one host."""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('MATCH_QUEUE_PATH', DEFAULT_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS pending_documents (
+                application_id TEXT PRIMARY KEY,
+                resume_key TEXT,
+                jd_key TEXT,
+                options TEXT,
+                updated_at REAL NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS match_jobs (
+                id TEXT PRIMARY KEY,
+                application_id TEXT NOT NULL,
+                resume_key TEXT NOT NULL,
+                jd_key TEXT NOT NULL,
+                options TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_expires_at REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_match_jobs_status_created ON match_jobs (status, created_at);
+            CREATE TABLE IF NOT EXISTS match_job_results (
+                job_id TEXT PRIMARY KEY,
+                application_id TEXT NOT NULL,
+                result TEXT NOT NULL,
+                completed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_match_job_results_application
+                ON match_job_results (application_id, completed_at);
+        ''')
+        # Files created before expiry was added lack the timestamps; their rows expire on the first pass
+        for table in ('pending_documents', 'match_jobs'):
+            columns = [row['name'] for row in self._conn.execute(f'PRAGMA table_info({table})')]
+            if 'updated_at' not in columns:
+                self._conn.execute(f'ALTER TABLE {table} ADD COLUMN updated_at REAL NOT NULL DEFAULT 0')
+
+    def transaction(self):
+        return _Transaction(self)
+
+    def query(self, sql: str, params=()):
+        """Plain SELECT outside any write transaction; WAL lets it run alongside writers in other processes."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT under the connection lock, so claims are exclusive across processes."""
+
+    def __init__(self, store: _SQLiteStore):
+        self.store = store
+
+    def __enter__(self):
+        self.store._lock.acquire()
+        self.store._conn.execute('BEGIN IMMEDIATE')
+        return self.store._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.store._conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self.store._lock.release()
+
+
+class SQLiteMatchQueue(MatchQueue):
+    def __init__(self, path: str = None):
+        self.store = _SQLiteStore(path)
+
+    def register_document(self, application_id: str, kind: str, blob_key: str, options: Dict = None) -> str:
+        if kind not in ('resume', 'jd'):
+            raise ValueError(f"Unknown document kind: {kind}")
+
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                'SELECT resume_key, jd_key, options FROM pending_documents WHERE application_id = ?',
+                (application_id,)
+            ).fetchone()
+            pending = dict(row) if row else {'resume_key': None, 'jd_key': None, 'options': None}
+            pending[f"{kind}_key"] = blob_key
+            if options:
+                pending['options'] = json.dumps(options)
+
+            if not pending['resume_key'] or not pending['jd_key']:
+                conn.execute(
+                    'INSERT OR REPLACE INTO pending_documents (application_id, resume_key, jd_key, options, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (application_id, pending['resume_key'], pending['jd_key'], pending['options'], time.time())
+                )
+                return None
+
+            conn.execute('DELETE FROM pending_documents WHERE application_id = ?', (application_id,))
+            return self._insert_job(
+                conn, application_id, pending['resume_key'], pending['jd_key'],
+                json.loads(pending['options']) if pending['options'] else {}
+            )
+
+    def enqueue(self, application_id: str, resume_key: str, jd_key: str, options: Dict = None) -> str:
+        with self.store.transaction() as conn:
+            return self._insert_job(conn, application_id, resume_key, jd_key, options or {})
+
+    def _insert_job(self, conn, application_id: str, resume_key: str, jd_key: str, options: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        conn.execute(
+            'INSERT INTO match_jobs (id, application_id, resume_key, jd_key, options, status, created_at) '
+            "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+            (job_id, application_id, resume_key, jd_key, json.dumps(options), time.time())
+        )
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: float = 300) -> Dict:
+        now = time.time()
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM match_jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND lease_expires_at < ?) ORDER BY created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE match_jobs SET status = 'running', worker_id = ?, lease_expires_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now + lease_seconds, row['id'])
+            )
+
+        job = dict(row)
+        job['options'] = json.loads(job['options'])
+        job['attempts'] += 1
+        return job
+
+    def complete(self, job_id: str):
+        with self.store.transaction() as conn:
+            conn.execute('DELETE FROM match_jobs WHERE id = ?', (job_id,))
+
+    def fail(self, job_id: str, error: str):
+        with self.store.transaction() as conn:
+            conn.execute(
+                "UPDATE match_jobs SET error = ?, worker_id = NULL, lease_expires_at = 0, updated_at = ?, "
+                "status = CASE WHEN attempts < ? THEN 'queued' ELSE 'failed' END WHERE id = ?",
+                (error, time.time(), MAX_ATTEMPTS, job_id)
+            )
+
+    def stats(self) -> Dict:
+        counts = {
+            row['status']: row['count']
+            for row in self.store.query('SELECT status, COUNT(*) AS count FROM match_jobs GROUP BY status')
+        }
+        pending_documents = self.store.query('SELECT COUNT(*) FROM pending_documents')[0][0]
+        return dict(counts, pending_documents=pending_documents)
+
+    def expire(self, pending_ttl: float = PENDING_DOCUMENT_TTL_SECONDS, failed_ttl: float = RESULT_TTL_SECONDS) -> Dict:
+        now = time.time()
+        with self.store.transaction() as conn:
+            pending = conn.execute(
+                'DELETE FROM pending_documents WHERE updated_at < ?', (now - pending_ttl,)
+            ).rowcount
+            failed = conn.execute(
+                "DELETE FROM match_jobs WHERE status = 'failed' AND updated_at < ?", (now - failed_ttl,)
+            ).rowcount
+        return {'pending_documents': pending, 'failed': failed}
+
+    def referenced_blobs(self) -> Set[str]:
+        rows = self.store.query(
+            'SELECT resume_key, jd_key FROM pending_documents UNION '
+            "SELECT resume_key, jd_key FROM match_jobs WHERE status != 'failed'"
+        )
+        keys = {key for row in rows for key in (row['resume_key'], row['jd_key'])}
+        keys.discard(None)
+        return keys
+
+
+class SQLiteResultStore(ResultStore):
+    def __init__(self, path: str = None):
+        self.store = _SQLiteStore(path)
+
+    def put(self, application_id: str, job_id: str, result: Dict):
+        now = time.time()
+        with self.store.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO match_job_results VALUES (?, ?, ?, ?)',
+                (job_id, application_id, json.dumps(result), now)
+            )
+            conn.execute('DELETE FROM match_job_results WHERE completed_at < ?', (now - RESULT_TTL_SECONDS,))
+
+    def _row_to_result(self, rows) -> Dict:
+        if not rows:
+            return None
+        return dict(json.loads(rows[0]['result']), job_id=rows[0]['job_id'], completed_at=rows[0]['completed_at'])
+
+    def get(self, application_id: str) -> Dict:
+        return self._row_to_result(self.store.query(
+            'SELECT job_id, result, completed_at FROM match_job_results WHERE application_id = ? '
+            'ORDER BY completed_at DESC LIMIT 1',
+            (application_id,)
+        ))
+
+    def get_job(self, job_id: str) -> Dict:
+        return self._row_to_result(self.store.query(
+            'SELECT job_id, result, completed_at FROM match_job_results WHERE job_id = ?', (job_id,)
+        ))
+
+
+def _timestamp(value: str) -> float:
+    """Epoch seconds of a PostgREST timestamptz string."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def _iso_before(seconds: float) -> str:
+    return datetime.fromtimestamp(time.time() - seconds, timezone.utc).isoformat()
+
+
+def _select_all(query_factory, page_size: int = 1000):
+    """Every row of a select, paged with range() so PostgREST's row cap never truncates it."""
+    rows = []
+    while True:
+        page = query_factory().range(len(rows), len(rows) + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+
+class SupabaseMatchQueue(MatchQueue):
+    """
+    Queue in Postgres tables of the Supabase project, shared by API nodes and workers on any host.
+    Claims and document pairing run in SQL functions (see database/data_migration.txt), so they are
+    atomic across nodes; needs the service role key.
+    """
+
+    def __init__(self):
+        from db import supabase
+        self.supabase = supabase
+
+    def register_document(self, application_id: str, kind: str, blob_key: str, options: Dict = None) -> str:
+        if kind not in ('resume', 'jd'):
+            raise ValueError(f"Unknown document kind: {kind}")
+        return self.supabase.rpc('register_match_document', {
+            'p_application_id': application_id,
+            'p_kind': kind,
+            'p_blob_key': blob_key,
+            'p_options': options or None,
+        }).execute().data or None
+
+    def enqueue(self, application_id: str, resume_key: str, jd_key: str, options: Dict = None) -> str:
+        response = self.supabase.table('match_jobs').insert({
+            'application_id': application_id,
+            'resume_key': resume_key,
+            'jd_key': jd_key,
+            'options': options or {},
+        }).execute()
+        return response.data[0]['id']
+
+    def claim(self, worker_id: str, lease_seconds: float = 300) -> Dict:
+        rows = self.supabase.rpc('claim_match_job', {
+            'p_worker_id': worker_id,
+            'p_lease_seconds': lease_seconds,
+        }).execute().data
+        return rows[0] if rows else None
+
+    def complete(self, job_id: str):
+        self.supabase.table('match_jobs').delete().eq('id', job_id).execute()
+
+    def fail(self, job_id: str, error: str):
+        self.supabase.rpc('fail_match_job', {
+            'p_job_id': job_id,
+            'p_error': error,
+            'p_max_attempts': MAX_ATTEMPTS,
+        }).execute()
+
+    def stats(self) -> Dict:
+        return self.supabase.rpc('match_queue_stats', {}).execute().data or {}
+
+    def expire(self, pending_ttl: float = PENDING_DOCUMENT_TTL_SECONDS, failed_ttl: float = RESULT_TTL_SECONDS) -> Dict:
+        pending = self.supabase.table('match_pending_documents').delete().lt(
+            'updated_at', _iso_before(pending_ttl)
+        ).execute().data or []
+        failed = self.supabase.table('match_jobs').delete().eq('status', 'failed').lt(
+            'updated_at', _iso_before(failed_ttl)
+        ).execute().data or []
+        return {'pending_documents': len(pending), 'failed': len(failed)}
+
+    def referenced_blobs(self) -> Set[str]:
+        rows = _select_all(lambda: self.supabase.table('match_pending_documents').select(
+            'resume_key, jd_key'
+        ).order('application_id'))
+        rows += _select_all(lambda: self.supabase.table('match_jobs').select(
+            'resume_key, jd_key'
+        ).neq('status', 'failed').order('id'))
+        keys = {key for row in rows for key in (row['resume_key'], row['jd_key'])}
+        keys.discard(None)
+        return keys
+
+
+class SupabaseResultStore(ResultStore):
+    """Results in a Postgres table of the Supabase project, readable from any host."""
+
+    def __init__(self):
+        from db import supabase
+        self.supabase = supabase
+
+    def put(self, application_id: str, job_id: str, result: Dict):
+        self.supabase.table('match_job_results').upsert({
+            'job_id': job_id,
+            'application_id': application_id,
+            'result': result,
+            'completed_at': datetime.now(timezone.utc).isoformat(),
+        }).execute()
+        self.supabase.table('match_job_results').delete().lt(
+            'completed_at', _iso_before(RESULT_TTL_SECONDS)
+        ).execute()
+
+    def _row_to_result(self, rows) -> Dict:
+        if not rows:
+            return None
+        return dict(rows[0]['result'], job_id=rows[0]['job_id'], completed_at=_timestamp(rows[0]['completed_at']))
+
+    def get(self, application_id: str) -> Dict:
+        return self._row_to_result(self.supabase.table('match_job_results').select(
+            'job_id, result, completed_at'
+        ).eq('application_id', application_id).order('completed_at', desc=True).limit(1).execute().data)
+
+    def get_job(self, job_id: str) -> Dict:
+        return self._row_to_result(self.supabase.table('match_job_results').select(
+            'job_id, result, completed_at'
+        ).eq('job_id', job_id).execute().data)
+
+
+def _load_class(path: str):
+    module_name, _, class_name = path.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# One in-process queue/result store per process, so API threads and worker threads see the same state
+_in_process = {}
+
+
+def create_match_queue() -> MatchQueue:
+    """
+    Queue selected by MATCH_QUEUE_BACKEND: 'sqlite' (default; processes on one host),
+    'supabase' (shared across hosts), 'memory', or 'package.module:ClassName' for any other implementation.
+    """
+    backend = os.getenv('MATCH_QUEUE_BACKEND', 'sqlite')
+    if backend == 'sqlite':
+        return SQLiteMatchQueue()
+    if backend == 'supabase':
+        return SupabaseMatchQueue()
+    if backend == 'memory':
+        return _in_process.setdefault('queue', InProcessMatchQueue())
+    return _load_class(backend)()
+
+
+def create_result_store() -> ResultStore:
+    """
+    Result store selected by RESULT_STORE_BACKEND: 'sqlite' (default; processes on one host),
+    'supabase' (shared across hosts), 'memory', or 'package.module:ClassName' for any other implementation.
+    """
+    backend = os.getenv('RESULT_STORE_BACKEND', 'sqlite')
+    if backend == 'sqlite':
+        return SQLiteResultStore()
+    if backend == 'supabase':
+        return SupabaseResultStore()
+    if backend == 'memory':
+        return _in_process.setdefault('results', InProcessResultStore())
+    return _load_class(backend)()
@@ -10,6 +10,10 @@ const JobsList: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [applyingJobs, setApplyingJobs] = useState<Set<string>>(new Set());
   const [appliedJobs, setAppliedJobs] = useState<Set<string>>(new Set());
+  // Applied jobs whose documents did not reach the backend, so no match score is coming yet
+  const [scoringPendingJobs, setScoringPendingJobs] = useState<Set<string>>(
+    new Set()
+  );
   const [matchPercentages, setMatchPercentages] = useState<
     Record<string, number>
   >({});
@@ -79,7 +83,8 @@ const JobsList: React.FC = () => {
   const downloadAndStoreResumeLocally = async (
     resumeUrl: string,
     candidateName: string,
-    jobId: string
+    jobId: string,
+    applicationId: string
   ) => {
     try {
       console.log("Downloading resume from:", resumeUrl);
@@ -96,6 +101,7 @@ const JobsList: React.FC = () => {
             resumeUrl,
             candidateName,
             jobId,
+            applicationId,
           }),
         }
       );
@@ -116,7 +122,8 @@ const JobsList: React.FC = () => {
   const downloadAndStoreJobDescription = async (
     jobId: string,
     companyName: string,
-    position: string
+    position: string,
+    applicationId: string
   ) => {
     try {
       console.log("Downloading job description for:", position);
@@ -132,6 +139,7 @@ const JobsList: React.FC = () => {
             jobId,
             companyName,
             position,
+            applicationId,
           }),
         }
       );
@@ -161,7 +169,7 @@ const JobsList: React.FC = () => {
       return;
     }
 
-    if (appliedJobs.has(jobId)) {
+    if (appliedJobs.has(jobId) && !scoringPendingJobs.has(jobId)) {
       toast({
         title: "Already Applied",
         description: "You have already applied for this position",
@@ -212,50 +220,91 @@ const JobsList: React.FC = () => {
         throw jobError;
       }
 
-      // Download and store resume in local storage
-      console.log("Starting resume download and local storage...");
-      await downloadAndStoreResumeLocally(
-        profileData.resume_url,
-        profileData.full_name || user.email || "Unknown",
-        jobId
-      );
-
-      // Download and store job description
-      console.log("Starting job description download and storage...");
-      await downloadAndStoreJobDescription(
-        jobId,
-        jobData.company,
-        jobData.position
-      );
+      // Insert the job application first so its ID can key the matching pipeline
+      let { data: applicationData, error } = await supabase
+        .from("job_applications")
+        .insert({
+          job_id: jobId,
+          candidate_id: user.id,
+          status: "applied",
+          applied_at: new Date().toISOString(),
+          resume_url: profileData.resume_url,
+          skills: profileData.skills,
+          experience_years: profileData.experience_years,
+        })
+        .select("id")
+        .single();
 
-      // Insert the job application with resume URL
-      const { error } = await supabase.from("job_applications").insert({
-        job_id: jobId,
-        candidate_id: user.id,
-        status: "applied",
-        applied_at: new Date().toISOString(),
-        resume_url: profileData.resume_url,
-        skills: profileData.skills,
-        experience_years: profileData.experience_years,
-      });
+      // Retrying after a failed scoring upload: the application already exists, so reuse it
+      if (error?.code === "23505") {
+        ({ data: applicationData, error } = await supabase
+          .from("job_applications")
+          .select("id")
+          .eq("job_id", jobId)
+          .eq("candidate_id", user.id)
+          .single());
+      }
 
       if (error) throw error;
 
+      // The application is recorded from here on; a failed upload only delays its match score
+      let documentsStored = true;
+      try {
+        // Download and store resume in local storage
+        console.log("Starting resume download and local storage...");
+        await downloadAndStoreResumeLocally(
+          profileData.resume_url,
+          profileData.full_name || user.email || "Unknown",
+          jobId,
+          applicationData.id
+        );
+
+        // Download and store job description
+        console.log("Starting job description download and storage...");
+        await downloadAndStoreJobDescription(
+          jobId,
+          jobData.company,
+          jobData.position,
+          applicationData.id
+        );
+      } catch (uploadError: any) {
+        console.error("Error storing documents for scoring:", uploadError);
+        documentsStored = false;
+      }
+
       // Add animation delay
       setTimeout(() => {
         setAppliedJobs((prev) => new Set(prev).add(jobId));
+        setScoringPendingJobs((prev) => {
+          const newSet = new Set(prev);
+          if (documentsStored) {
+            newSet.delete(jobId);
+          } else {
+            newSet.add(jobId);
+          }
+          return newSet;
+        });
         setApplyingJobs((prev) => {
           const newSet = new Set(prev);
           newSet.delete(jobId);
           return newSet;
         });
 
-        toast({
-          title: "Success",
-          description:
-            "Application submitted successfully and documents stored locally",
-          variant: "default",
-        });
+        toast(
+          documentsStored
+            ? {
+                title: "Success",
+                description:
+                  "Application submitted successfully and documents stored locally",
+                variant: "default",
+              }
+            : {
+                title: "Application Submitted",
+                description:
+                  "Match scoring is pending because your documents could not be processed. Use Retry Scoring to try again.",
+                variant: "default",
+              }
+        );
       }, 1000);
     } catch (error: any) {
       console.error("Error applying for job:", error);
@@ -347,6 +396,11 @@ const JobsList: React.FC = () => {
                         Match: {matchPercentages[job.id].toFixed(1)}%
                       </span>
                     )}
+                    {scoringPendingJobs.has(job.id) && (
+                      <span className="bg-yellow-100 text-yellow-800 px-3 py-1 rounded-full text-sm font-medium">
+                        Scoring pending
+                      </span>
+                    )}
                   </div>
                 </div>
 
@@ -379,12 +433,17 @@ const JobsList: React.FC = () => {
 
                 <button
                   onClick={() => handleApply(job.id)}
-                  disabled={applyingJobs.has(job.id) || appliedJobs.has(job.id)}
+                  disabled={
+                    applyingJobs.has(job.id) ||
+                    (appliedJobs.has(job.id) && !scoringPendingJobs.has(job.id))
+                  }
                   className={`relative flex items-center justify-center px-6 py-2 rounded-lg font-semibold transition-all duration-200 ${
-                    appliedJobs.has(job.id)
-                      ? "bg-green-100 text-green-800 cursor-default"
-                      : applyingJobs.has(job.id)
+                    applyingJobs.has(job.id)
                       ? "bg-blue-100 text-blue-800 cursor-wait"
+                      : scoringPendingJobs.has(job.id)
+                      ? "bg-yellow-100 text-yellow-800 hover:bg-yellow-200"
+                      : appliedJobs.has(job.id)
+                      ? "bg-green-100 text-green-800 cursor-default"
                       : "bg-gradient-to-r from-blue-600 to-blue-700 text-white hover:from-blue-700 hover:to-blue-800"
                   }`}>
                   {applyingJobs.has(job.id) ? (
@@ -408,6 +467,8 @@ const JobsList: React.FC = () => {
                       </svg>
                       Applying...
                     </span>
+                  ) : scoringPendingJobs.has(job.id) ? (
+                    "Retry Scoring"
                   ) : appliedJobs.has(job.id) ? (
                     <span className="flex items-center">
                       <Check className="h-5 w-5 mr-2" />
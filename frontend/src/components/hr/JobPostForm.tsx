@@ -48,7 +48,7 @@ const JobPostForm: React.FC<JobPostFormProps> = ({ onJobCreated }) => {
     setIsSubmitting(true);
 
     try {
-      const { error } = await supabase
+      const { data: jobData, error } = await supabase
         .from('jobs')
         .insert([
           {
@@ -62,13 +62,24 @@ const JobPostForm: React.FC<JobPostFormProps> = ({ onJobCreated }) => {
             hr_user_id: user.id,
             is_active: true
           }
-        ]);
+        ])
+        .select('id')
+        .single();
 
       if (error) {
         console.error('Supabase error:', error);
         throw error;
       }
 
+      // Precompute the job's required-skill vector; matching falls back to computing it lazily
+      try {
+        await fetch(`http://localhost:5000/api/jobs/${jobData.id}/skills`, {
+          method: 'POST',
+        });
+      } catch (skillsError) {
+        console.error('Error precomputing job skills:', skillsError);
+      }
+
       toast({
         title: "Success!",
         description: "Job posted successfully and is now live!",